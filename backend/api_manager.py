@@ -7,13 +7,53 @@ import os
 import time 
 from typing import Optional ,Callable ,Any 
 
+from client_pool import ClientPool 
+from key_pool import KeyPool 
+from rate_limiter import RateLimiter ,RateLimitExceeded 
+
+
+def _is_quota_error (error :Exception )->bool :
+    """Upstream 429 / exhausted quota"""
+    code =getattr (error ,"code",None )
+    if isinstance (code ,int ):
+        return code ==429 
+    error_msg =str (error ).lower ()
+    return any (x in error_msg for x in ["quota","rate limit","429","resource_exhausted"])
+
+
+def _is_auth_error (error :Exception )->bool :
+    """Rejected key (401/403): the key itself is unhealthy"""
+    code =getattr (error ,"code",None )
+    if isinstance (code ,int ):
+        return code in (401 ,403 )
+    error_msg =str (error ).lower ()
+    return any (x in error_msg for x in ["api key not valid","api_key_invalid","permission_denied","unauthenticated"])
+
+
+def _is_retryable_error (error :Exception )->bool :
+    """Quota (429) and server-side (5xx) errors count against a key's health"""
+    code =getattr (error ,"code",None )
+    if isinstance (code ,int )and code >=500 :
+        return True 
+    if _is_quota_error (error ):
+        return True 
+    error_msg =str (error ).lower ()
+    return any (x in error_msg for x in ["503","unavailable"])
+
+
+def _extra_keys (env_name :str )->list :
+    return [k .strip ()for k in os .getenv (env_name ,"").split (",")if k .strip ()]
+
 
 class APIKeyManager :
     """
-    Manages 3 Gemini API keys with dedicated purposes:
-    - Key 1 (DEBATE): Main debate counter-arguments (highest priority)
-    - Key 2 (ANALYSIS): Embeddings, drift detection, argument analysis
-    - Key 3 (JUDGE): Post-debate summaries and comprehensive feedback
+    Manages Gemini API key pools with dedicated purposes:
+    - Pool 1 (DEBATE): Main debate counter-arguments (highest priority)
+    - Pool 2 (ANALYSIS): Embeddings, drift detection, argument analysis
+    - Pool 3 (JUDGE): Post-debate summaries and comprehensive feedback
+
+    GEMINI_API_KEY_1..3 seed each pool; GEMINI_DEBATE_KEYS, GEMINI_ANALYSIS_KEYS
+    and GEMINI_JUDGE_KEYS add more keys as comma-separated lists.
     """
 
     def __init__ (self ):
@@ -37,12 +77,27 @@ class APIKeyManager :
         "judge":True 
         }
 
+        self .rate_limiter =RateLimiter ()
+        self .queue_deadline =float (os .getenv ("GEMINI_QUEUE_DEADLINE",3.0 ))
+
+        self .pools ={}
+        for purpose ,primary in [
+        ("debate",self .debate_key ),
+        ("analysis",self .analysis_key ),
+        ("judge",self .judge_key )
+        ]:
+            keys =[primary ]
+            for extra in _extra_keys (f"GEMINI_{purpose .upper ()}_KEYS"):
+                if extra not in keys :
+                    keys .append (extra )
+            self .pools [purpose ]=KeyPool (purpose ,keys ,self .rate_limiter )
+
         print ("="*60 )
         print ("🔑 API Key Manager - Dedicated Strategy")
         print ("="*60 )
-        print (f"✅ DEBATE_KEY (Key 1): Loaded - Handles debate responses")
-        print (f"✅ ANALYSIS_KEY (Key 2): Loaded - Handles drift/embeddings")
-        print (f"✅ JUDGE_KEY (Key 3): Loaded - Handles AI judge summaries")
+        print (f"✅ DEBATE_KEY (Key 1): Loaded - Handles debate responses ({len (self .pools ['debate'].keys )} in pool)")
+        print (f"✅ ANALYSIS_KEY (Key 2): Loaded - Handles drift/embeddings ({len (self .pools ['analysis'].keys )} in pool)")
+        print (f"✅ JUDGE_KEY (Key 3): Loaded - Handles AI judge summaries ({len (self .pools ['judge'].keys )} in pool)")
         print ("="*60 )
 
     def get_debate_key (self )->str :
@@ -62,54 +117,74 @@ class APIKeyManager :
     func :Callable ,
     key_type :str ="debate",
     max_retries :int =3 ,
+    tokens :int =0 ,
+    deadline :Optional [float ]=None ,
     *args ,
     **kwargs 
     )->Any :
         """
-        Call function with automatic retry and exponential backoff
-        
+        Call function on the healthiest key of a pool, failing over on 429/5xx
+
+        A call waits for bucket capacity only while the total wait fits in the
+        deadline (GEMINI_QUEUE_DEADLINE, 3 s by default, on request
+        threads). A 429/5xx puts the key into a jittered cooldown and the next
+        attempt goes to another key or waits that cooldown out, again only
+        within the deadline. Background callers (summary jobs) pass a longer
+        deadline and are requeued with retry_after beyond it.
+
         Args:
             func: Function to call (receives api_key as first argument)
-            key_type: Which key to use ("debate", "analysis", "judge")
+            key_type: Which pool to use ("debate", "analysis", "judge")
             max_retries: Maximum retry attempts
+            tokens: Estimated tokens for the call (TPM accounting)
+            deadline: Longest total queue wait in seconds (default GEMINI_QUEUE_DEADLINE)
+
+        Raises:
+            RateLimitExceeded: When no key in the pool can admit the call before the deadline
+            Exception: The last upstream error when the final failure was not a quota error
         """
 
-        if key_type =="debate":
-            api_key =self .debate_key 
-            key_name ="DEBATE_KEY"
-        elif key_type =="analysis":
-            api_key =self .analysis_key 
-            key_name ="ANALYSIS_KEY"
-        elif key_type =="judge":
-            api_key =self .judge_key 
-            key_name ="JUDGE_KEY"
-        else :
+        pool =self .pools .get (key_type )
+        if pool is None :
             raise ValueError (f"Invalid key_type: {key_type }")
 
-        last_error =None 
+        deadline_at =time .monotonic ()+(self .queue_deadline if deadline is None else deadline )
 
+        last_error =None 
         for attempt in range (max_retries ):
             try :
-                result =func (api_key ,*args ,**kwargs )
+                key ,wait_time =pool .acquire (tokens ,max (0.0 ,deadline_at -time .monotonic ()))
+            except RateLimitExceeded :
+                if last_error is not None and not _is_quota_error (last_error ):
+                    break 
+                raise 
+            if wait_time >0 :
+                time .sleep (wait_time )
+
+            started =time .monotonic ()
+            try :
+                result =func (key .api_key ,*args ,**kwargs )
+                pool .record_success (key ,time .monotonic ()-started )
                 return result 
 
             except Exception as e :
-                error_msg =str (e ).lower ()
-                last_error =e 
-
-
-                if any (x in error_msg for x in ["quota","rate limit","429","resource_exhausted"]):
-                    wait_time =2 **attempt 
-                    print (f"⚠️  Rate limit on {key_name } (attempt {attempt +1 }). Retrying in {wait_time }s...")
-                    time .sleep (wait_time )
+                if _is_retryable_error (e ):
+                    last_error =e 
+                    pool .record_failure (key )
+                    cooldown =key .bucket .penalize (2 **attempt )
+                    print (f"⚠️  Upstream error on {key .name } (attempt {attempt +1 }). Key cooling down for {cooldown :.1f}s")
                     continue 
                 else :
-
-                    print (f"❌ Error on {key_name }: {e }")
+                    if _is_auth_error (e ):
+                        pool .record_failure (key )
+                    else :
+                        pool .record_neutral (key )
+                    print (f"❌ Error on {key .name }: {e }")
                     raise e 
 
-
-        print (f"❌ All {max_retries } retry attempts failed on {key_name }")
+        print (f"❌ All {max_retries } retry attempts failed on {key_type .upper ()} pool")
+        if _is_quota_error (last_error ):
+            raise RateLimitExceeded (f"{key_type .upper ()} pool",min (k .bucket .retry_after ()for k in pool .keys ))
         raise last_error 
 
     def get_key_status (self )->dict :
@@ -118,12 +193,15 @@ class APIKeyManager :
         "debate_key_loaded":self .loaded_keys ["debate"],
         "analysis_key_loaded":self .loaded_keys ["analysis"],
         "judge_key_loaded":self .loaded_keys ["judge"],
-        "total_keys":sum (self .loaded_keys .values ())
+        "total_keys":sum (len (pool .keys )for pool in self .pools .values ()),
+        "pools":{purpose :pool .get_status ()for purpose ,pool in self .pools .items ()},
+        "client_pool":client_pool .get_stats ()
         }
 
 
 
 api_manager :Optional [APIKeyManager ]=None 
+client_pool =ClientPool ()
 
 
 def get_api_manager ()->APIKeyManager :
@@ -132,3 +210,8 @@ def get_api_manager ()->APIKeyManager :
     if api_manager is None :
         api_manager =APIKeyManager ()
     return api_manager 
+
+
+def get_client (api_key :str ):
+    """Get the shared genai.Client for an API key (one per key per process)"""
+    return client_pool .get (api_key )
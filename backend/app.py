@@ -1,6 +1,8 @@
+import atexit
 import os
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timezone, timedelta
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
 from dotenv import load_dotenv
 from pymongo import MongoClient
@@ -9,12 +11,27 @@ from flask_jwt_extended import JWTManager, create_access_token, jwt_required, ge
 from bson import ObjectId
 
 from api_manager import get_api_manager
-from intelligence.argument_analyzer import analyze_with_response
-from intelligence.drift_service import calculate_drift_score
+from rate_limiter import RateLimitExceeded, estimate_tokens
+from intelligence.argument_analyzer import (
+    analyze_with_response, open_response_stream, resolve_stream_metrics, get_response_stats
+)
+from intelligence.drift_service import calculate_drift_embeddings, score_drift, get_drift_stats
 from intelligence.drift_policy import interpret_drift_score
 from intelligence.dds_engine import update_difficulty
+from intelligence.response_parser import CombinedResponseParser
 from models.user_state import UserState
+from models.debate_session import DebateSession, OVERVIEW_PROJECTION
+from models.session_cache import SessionCache
+from models import user_stats
+from utils.single_flight import FlightTimeout, SingleFlight, prompt_key
+from utils.lru_cache import LRUCache
+from utils.job_queue import JobQueue
+from utils.pagination import keyset_page, page_size
+from utils.db_logger import BatchWriter, log_debate_turn
+from utils.fast_json import FastJSONProvider, json_backend
+from utils.compression import ResponseCompressor
 from intelligence.ai_judge import generate_debate_summary, calculate_quick_score
+from intelligence.judge_state import JudgeState
 
 load_dotenv()
 
@@ -30,9 +47,105 @@ db = mongo_client.debate_platform
 debates_collection = db.debates
 users_collection = db.users
 summaries_collection = db.debate_summaries
+sessions_collection = db.debate_sessions
+summary_jobs_collection = db.summary_jobs
+user_stats_collection = db.user_stats
+
+# Compound indexes for the queries below, created (idempotently) at startup;
+# an optional third element holds create_index options
+INDEXES = [
+    (users_collection, [("email", 1)]),
+    (debates_collection, [("user_id", 1), ("created_at", -1), ("_id", -1)]),
+    (debates_collection, [("user_id", 1), ("idempotency_key", 1), ("created_at", -1)]),
+    (debates_collection, [("session_id", 1)]),
+    (summaries_collection, [("user_id", 1), ("created_at", -1), ("_id", -1)]),
+    (sessions_collection, [("user_id", 1), ("created_at", -1), ("_id", -1)]),
+    # One active summary job per dedupe key; workers claim by (status, not_before)
+    (summary_jobs_collection, [("dedupe_key", 1)], {"unique": True, "partialFilterExpression": {"active": True}}),
+    (summary_jobs_collection, [("status", 1), ("not_before", 1)])
+]
+
+def ensure_indexes():
+    for collection, keys, *options in INDEXES:
+        try:
+            collection.create_index(keys, **dict(*options))
+        except Exception as e:
+            print(f"⚠️  Could not create index {keys} on {collection.name}: {e}")
+
+ensure_indexes()
+
+# Audit copies and stats counters are batched off the request path; the turn itself is written directly
+def batch_writer(collection):
+    writer = BatchWriter(
+        collection,
+        max_batch=int(os.getenv("WRITE_BEHIND_BATCH", 100)),
+        flush_interval=float(os.getenv("WRITE_BEHIND_INTERVAL", 1.0)),
+        max_buffer=int(os.getenv("WRITE_BEHIND_BUFFER", 10000)),
+        put_timeout=float(os.getenv("WRITE_BEHIND_PUT_TIMEOUT", 0.5))
+    )
+    writer.start()
+    atexit.register(writer.stop)
+    return writer
+
+audit_writer = batch_writer(db.debate_logs)
+stats_writer = batch_writer(user_stats_collection)
+
+# Drift scoring runs beside the counter-argument call instead of before it
+PARALLEL_TURN_PIPELINE = os.getenv("PARALLEL_TURN_PIPELINE", "true").lower() != "false"
+turn_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("TURN_EXECUTOR_WORKERS", 8)),
+    thread_name_prefix="turn"
+)
+
+# Embed every argument (not only escalated ones) so the session centroid sees all turns
+SESSION_DRIFT_EMBED_ALL = os.getenv("SESSION_DRIFT_EMBED_ALL", "false").lower() == "true"
+
+# Resubmitted turns (retries, double-clicks) within this window replay the first result
+IDEMPOTENCY_WINDOW = int(os.getenv("IDEMPOTENCY_WINDOW", 300))
+completed_turns = LRUCache(
+    max_entries=int(os.getenv("IDEMPOTENCY_CACHE_ITEMS", 1000)),
+    max_bytes=16 * 1024 * 1024,
+    ttl=IDEMPOTENCY_WINDOW
+)
+turn_flights = SingleFlight()
+
+# A duplicate gives up on a stuck original after this long and is told to retry
+IDEMPOTENCY_WAIT_TIMEOUT = float(os.getenv("IDEMPOTENCY_WAIT_TIMEOUT", 20))
+TURN_IN_PROGRESS_RETRY_AFTER = 5
+
+# Compare-and-set retries when turns race on the same session document
+SESSION_SAVE_ATTEMPTS = int(os.getenv("SESSION_SAVE_ATTEMPTS", 3))
+
+# Recent sessions stay in memory; their updates reach Mongo in batched write-behind flushes
+session_cache = SessionCache(
+    sessions_collection,
+    max_entries=int(os.getenv("SESSION_CACHE_ITEMS", 2000)),
+    flush_interval=float(os.getenv("SESSION_FLUSH_INTERVAL", 1.0))
+)
+session_cache.start()
+atexit.register(session_cache.stop)
+
+# Prompt template + expected output tokens on top of the user-supplied text
+DEBATE_CALL_TOKENS = 600
+SUMMARY_CALL_TOKENS = 1200
+
+# Summary workers are off the request path, so they can queue for capacity longer
+# (past this the job is requeued with the limiter's retry_after)
+SUMMARY_QUEUE_DEADLINE = float(os.getenv("SUMMARY_QUEUE_DEADLINE", 30))
 
 app = Flask(__name__)
 
+# orjson (when installed) for every jsonify; datetimes go out as ISO 8601 UTC, ObjectIds as strings
+app.json = FastJSONProvider(app)
+
+# Large JSON bodies are gzip/Brotli-compressed per Accept-Encoding; SSE streams are left alone
+compressor = ResponseCompressor(
+    min_size=int(os.getenv("COMPRESSION_MIN_BYTES", 1024)),
+    gzip_level=int(os.getenv("GZIP_LEVEL", 6)),
+    brotli_quality=int(os.getenv("BROTLI_QUALITY", 4))
+)
+compressor.init_app(app)
+
 CORS(app, resources={
     r"/api/*": {
         "origins": [
@@ -40,7 +153,8 @@ CORS(app, resources={
             "https://ai-debate-platform-ecru.vercel.app"
         ],
         "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-        "allow_headers": ["Content-Type", "Authorization"],
+        "allow_headers": ["Content-Type", "Authorization", "Idempotency-Key"],
+        "expose_headers": ["Retry-After", "ETag"],
         "supports_credentials": True
     }
 })
@@ -50,6 +164,30 @@ app.config["JWT_ACCESS_TOKEN_EXPIRES"] = timedelta(days=7)  # Tokens valid for 7
 bcrypt = Bcrypt(app)
 jwt = JWTManager(app)
 
+def retry_after_seconds(error):
+    return max(1, int(error.retry_after + 0.999))
+
+def rate_limited_response(error):
+    """429 with a Retry-After hint when a key can't admit the call in time"""
+    retry_after = retry_after_seconds(error)
+    response = jsonify({
+        "error": "AI service is busy, please retry shortly",
+        "retry_after": retry_after
+    })
+    response.status_code = 429
+    response.headers["Retry-After"] = str(retry_after)
+    return response
+
+def turn_in_progress_response():
+    """409 for a duplicate turn whose original is still running"""
+    response = jsonify({
+        "error": "An identical request is still in progress",
+        "retry_after": TURN_IN_PROGRESS_RETRY_AFTER
+    })
+    response.status_code = 409
+    response.headers["Retry-After"] = str(TURN_IN_PROGRESS_RETRY_AFTER)
+    return response
+
 @app.route("/api/register", methods=["POST"])
 def register():
     data = request.json or {}
@@ -131,156 +269,645 @@ def google_auth():
         "email": email
     }), 200
 
-@app.route("/api/debate", methods=["POST"])
-@jwt_required()
-def handle_debate():
-    current_user = get_jwt_identity()
-
+def load_turn(current_user):
+    """
+    Validate a debate turn request and load its session.
+    Returns (turn, None) on success or (None, error response).
+    """
     data = request.json or {}
     topic = data.get("topic", "").strip()
     argument = data.get("argument", "").strip()
 
     if not topic or not argument:
-        return jsonify({"error": "Topic and argument required"}), 400
+        return None, (jsonify({"error": "Topic and argument required"}), 400)
 
     if len(argument) < 10:
-        return jsonify({"error": "Argument too short"}), 400
+        return None, (jsonify({"error": "Argument too short"}), 400)
 
-    if not api_manager:
-        return jsonify({"error": "AI service unavailable"}), 503
+    session_id = data.get("session_id")
+    session = None
+    if session_id:
+        try:
+            session = session_cache.load(session_id, current_user, topic)
+        except Exception:
+            session = None
 
-    try:
-        user_state = UserState()
+        if not session:
+            return None, (jsonify({"error": "Session not found"}), 404)
 
-        # Calculate drift score for metrics only (don't enforce)
-        def drift_call(api_key):
-            return calculate_drift_score(api_key, topic, argument)
+    if not api_manager:
+        return None, (jsonify({"error": "AI service unavailable"}), 503)
 
-        drift_score = api_manager.call_with_retry(drift_call, key_type="analysis")
-        drift_result = interpret_drift_score(drift_score)
-        
-        print(f"🔍 DRIFT CHECK - Topic: '{topic}'")
-        print(f"🔍 Argument: '{argument[:50]}...'")
-        print(f"🔍 Drift Score: {drift_score:.3f} | Status: {drift_result['status']}")
+    # Client-supplied key, else the same user/session/topic/argument counts as a repeat
+    client_key = request.headers.get("Idempotency-Key") or data.get("idempotency_key")
+    if client_key:
+        idempotency_key = prompt_key("client", current_user, str(client_key))
+    else:
+        idempotency_key = prompt_key(
+            "derived", current_user, session_id or "", topic, " ".join(argument.lower().split())
+        )
+
+    return {
+        "user_id": current_user,
+        "topic": topic,
+        "argument": argument,
+        "session_id": session_id,
+        "session": session,
+        "idempotency_key": idempotency_key
+    }, None
+
+def turn_response(debate_doc, debate_id):
+    """Response body for a persisted debate turn"""
+    return {
+        "debate_id": debate_id,
+        "ai_response": debate_doc["ai_response"],
+        "difficulty_level": debate_doc["difficulty_level"],
+        "drift_score": round(debate_doc["drift_score"], 3),
+        "drift_status": interpret_drift_score(debate_doc["drift_score"]),
+        "session_id": debate_doc.get("session_id"),
+        "session_drift": debate_doc.get("session_drift"),
+        "turn_score": debate_doc["turn_score"],
+        "metrics": debate_doc["metrics"]
+    }
 
-        # AI will handle off-topic detection in its response
-        user_state.drift_score = drift_score
+def find_completed_turn(turn):
+    """Result of an identical turn finished within the idempotency window, if any"""
+    key = turn["idempotency_key"]
+    body = completed_turns.get(key)
+    if body is not None:
+        return body
+
+    debate = debates_collection.find_one({
+        "user_id": turn["user_id"],
+        "idempotency_key": key,
+        "created_at": {"$gte": datetime.now(timezone.utc) - timedelta(seconds=IDEMPOTENCY_WINDOW)}
+    })
+    if not debate:
+        return None
+
+    body = turn_response(debate, str(debate["_id"]))
+    completed_turns.put(key, body)
+    return body
+
+def claim_turn(turn):
+    """
+    Join an identical turn that is already running, or become its leader.
+    Returns (body, None) for a duplicate (raises the leader's error if it
+    failed, or FlightTimeout if it is still running after
+    IDEMPOTENCY_WAIT_TIMEOUT) or (None, flight) when the caller must run the
+    turn and then call release_turn.
+    """
+    body = find_completed_turn(turn)
+    if body is not None:
+        print("♻️  Replaying completed debate turn")
+        return body, None
+
+    key = turn["idempotency_key"]
+    flight, leader = turn_flights.claim(key)
+    if not leader:
+        print("♻️  Waiting on identical in-flight debate turn")
+        return SingleFlight.wait(flight, IDEMPOTENCY_WAIT_TIMEOUT), None
+
+    # It may have finished between the lookup and the claim
+    body = find_completed_turn(turn)
+    if body is not None:
+        turn_flights.resolve(key, flight, body)
+        return body, None
+    return None, flight
+
+def release_turn(turn, flight, body=None, error=None):
+    if body is not None:
+        completed_turns.put(turn["idempotency_key"], body)
+    turn_flights.resolve(turn["idempotency_key"], flight, body, error)
+
+def start_turn(turn):
+    """
+    Start drift scoring and pick the difficulty for the counter-argument.
+    Adds difficulty_level, drift_future and turn_vectors to turn.
+    """
+    topic = turn["topic"]
+    argument = turn["argument"]
+    session = turn["session"]
+    # Continue from the session's state so difficulty follows the whole debate
+    user_state = UserState.from_dict(session.user_state.to_dict() if session else None)
+
+    # Calculate drift score for metrics only (don't enforce)
+    # Clear-cut turns are scored locally; only ambiguous ones hit the embeddings.
+    # Embedded arguments also feed the session centroid.
+    turn_vectors = {}
+
+    def drift_call(api_key):
+        score, turn_vectors["topic"], turn_vectors["argument"] = calculate_drift_embeddings(
+            api_key, topic, argument
+        )
+        return score
+
+    def embedding_drift():
+        return api_manager.call_with_retry(
+            drift_call, key_type="analysis", tokens=estimate_tokens(topic + argument)
+        )
+
+    if PARALLEL_TURN_PIPELINE:
+        # Difficulty comes from the state before this turn, so the
+        # counter-argument doesn't have to wait for the embeddings
+        difficulty_level = update_difficulty(user_state)
+        drift_future = turn_executor.submit(
+            score_drift, topic, argument, embedding_drift,
+            require_embedding=SESSION_DRIFT_EMBED_ALL
+        )
+    else:
+        drift_future = Future()
+        drift_future.set_result(score_drift(
+            topic, argument, embedding_drift, require_embedding=SESSION_DRIFT_EMBED_ALL
+        ))
+        user_state.drift_score = drift_future.result()[0]
         difficulty_level = update_difficulty(user_state)
 
-        def combined_call(api_key):
-            return analyze_with_response(api_key, topic, argument, difficulty_level)
+    turn.update(
+        difficulty_level=difficulty_level,
+        drift_future=drift_future,
+        turn_vectors=turn_vectors
+    )
 
-        result = api_manager.call_with_retry(combined_call, key_type="debate")
+def finish_turn(turn, ai_reply, metrics):
+    """Wait for drift, update the session, persist the turn and build the response body"""
+    topic = turn["topic"]
+    argument = turn["argument"]
+    drift_score, drift_source = turn["drift_future"].result()
+    drift_result = interpret_drift_score(drift_score)
+
+    print(f"🔍 DRIFT CHECK - Topic: '{topic}'")
+    print(f"🔍 Argument: '{argument[:50]}...'")
+    print(f"🔍 Drift Score: {drift_score:.3f} ({drift_source}) | Status: {drift_result['status']}")
+
+    turn_score = calculate_quick_score(metrics, drift_score)
+    turn_vectors = turn["turn_vectors"]
+    debate_id = ObjectId()
+
+    # Fold the turn into the session (user state, centroid, judge digest, stats)
+    # and write it back in one round-trip; a concurrent turn forces a reload
+    session = turn["session"] or DebateSession.new(turn["user_id"], topic)
+    new_session = turn["session"] is None
+    for _ in range(SESSION_SAVE_ATTEMPTS):
+        session_signals = session.record_turn(
+            str(debate_id), argument, ai_reply, metrics, drift_score, turn_score,
+            turn["difficulty_level"], turn_vectors.get("topic"), turn_vectors.get("argument")
+        )
+        if session_cache.save(session):
+            break
+        print("♻️  Session changed concurrently, reloading")
+        session = session_cache.load(session.id, turn["user_id"])
+        if session is None:
+            # Deleted (or not visible) since the turn started; keep the reply in a fresh session
+            print("⚠️  Session disappeared during the turn, starting a new one")
+            session = DebateSession.new(turn["user_id"], topic)
+            new_session = True
+    else:
+        raise RuntimeError("Debate session is busy, please retry")
+
+    session_id = session.session_id
+    now = session.updated_at
+
+    debate_doc = {
+        "_id": debate_id,
+        "session_id": session_id,
+        "session_drift": session_signals,
+        "idempotency_key": turn["idempotency_key"],
+        "user_id": turn["user_id"],
+        "topic": topic,
+        "user_argument": argument,
+        "ai_response": ai_reply,
+        "difficulty_level": turn["difficulty_level"],
+        "drift_score": drift_score,
+        "drift_source": drift_source,
+        "metrics": metrics,
+        "turn_score": turn_score,
+        "created_at": now
+    }
 
-        ai_reply = result["ai_response"]
-        metrics = result["metrics"]
+    debates_collection.insert_one(debate_doc)
+    log_debate_turn(db, debate_doc, audit_writer)
+    user_stats.record_turn(
+        stats_writer, turn["user_id"], metrics, drift_score, turn_score, now,
+        new_session=new_session
+    )
 
-        user_state.update_from_metrics(metrics, drift_score)
-        turn_score = calculate_quick_score(metrics, drift_score)
+    return turn_response(debate_doc, str(debate_id))
 
-        debate_doc = {
-            "user_id": current_user,
-            "topic": topic,
-            "user_argument": argument,
-            "ai_response": ai_reply,
-            "difficulty_level": difficulty_level,
-            "drift_score": drift_score,
-            "metrics": metrics,
-            "turn_score": turn_score,
-            "created_at": datetime.now(timezone.utc)
-        }
+def sse_event(event, data):
+    return f"event: {event}\ndata: {app.json.dumps(data)}\n\n"
 
-        result_db = debates_collection.insert_one(debate_doc)
-        debate_id = str(result_db.inserted_id)
+def event_stream(events):
+    return Response(
+        events,
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
-        return jsonify({
-            "debate_id": debate_id,
-            "ai_response": ai_reply,
-            "difficulty_level": difficulty_level,
-            "drift_score": round(drift_score, 3),
-            "drift_status": drift_result,
-            "turn_score": turn_score,
-            "metrics": metrics
-        })
+def replay_events(body):
+    """A finished turn as the same event sequence a live stream ends with"""
+    yield sse_event("chunk", {"text": body["ai_response"]})
+    yield sse_event("metrics", body["metrics"])
+    yield sse_event("done", body)
+
+@app.route("/api/debate", methods=["POST"])
+@jwt_required()
+def handle_debate():
+    current_user = get_jwt_identity()
+
+    turn, error_response = load_turn(current_user)
+    if error_response:
+        return error_response
+
+    try:
+        body, flight = claim_turn(turn)
+        if flight is None:
+            return jsonify(body)
+
+        try:
+            start_turn(turn)
+            topic = turn["topic"]
+            argument = turn["argument"]
+
+            def combined_call(api_key):
+                return analyze_with_response(api_key, topic, argument, turn["difficulty_level"])
+
+            result = api_manager.call_with_retry(
+                combined_call, key_type="debate", tokens=estimate_tokens(topic + argument) + DEBATE_CALL_TOKENS
+            )
+
+            body = finish_turn(turn, result["ai_response"], result["metrics"])
+        except BaseException as e:
+            release_turn(turn, flight, error=e)
+            raise
+        release_turn(turn, flight, body)
+        return jsonify(body)
+
+    except FlightTimeout as e:
+        print("DEBATE TURN IN PROGRESS:", e)
+        return turn_in_progress_response()
+
+    except RateLimitExceeded as e:
+        print("DEBATE RATE LIMITED:", e)
+        return rate_limited_response(e)
 
     except Exception as e:
         print("DEBATE ERROR:", e)
         return jsonify({"error": "AI quota exceeded or internal error"}), 503
 
-@app.route("/api/debate/summary", methods=["POST"])
+@app.route("/api/debate/stream", methods=["POST"])
 @jwt_required()
-def generate_summary():
+def handle_debate_stream():
+    """
+    Same turn as /api/debate, relayed as Server-Sent Events:
+    chunk ({text}) as the counter-argument streams, metrics once the
+    ANALYSIS block parses, then done (the /api/debate body) or error.
+    """
     current_user = get_jwt_identity()
 
-    data = request.json or {}
-    topic = data.get("topic")
-    debate_ids = data.get("debate_ids", [])
+    turn, error_response = load_turn(current_user)
+    if error_response:
+        return error_response
 
-    if not topic or not debate_ids:
-        return jsonify({"error": "Topic and debate_ids required"}), 400
-
-    if not api_manager:
-        return jsonify({"error": "AI service unavailable"}), 503
+    topic = turn["topic"]
+    argument = turn["argument"]
 
     try:
+        body, flight = claim_turn(turn)
+        if flight is None:
+            return event_stream(replay_events(body))
+
+        try:
+            start_turn(turn)
+
+            # Opening the stream pulls the first chunk, so quota errors are still retried here
+            def stream_call(api_key):
+                return open_response_stream(api_key, topic, argument, turn["difficulty_level"])
+
+            chunks = api_manager.call_with_retry(
+                stream_call, key_type="debate", tokens=estimate_tokens(topic + argument) + DEBATE_CALL_TOKENS
+            )
+        except BaseException as e:
+            release_turn(turn, flight, error=e)
+            raise
+
+    except FlightTimeout as e:
+        print("DEBATE TURN IN PROGRESS:", e)
+        return turn_in_progress_response()
+
+    except RateLimitExceeded as e:
+        print("DEBATE RATE LIMITED:", e)
+        return rate_limited_response(e)
+
+    except Exception as e:
+        print("DEBATE STREAM ERROR:", e)
+        return jsonify({"error": "AI quota exceeded or internal error"}), 503
+
+    def events():
+        parser = CombinedResponseParser()
+        metrics_sent = False
+        body = None
+        error = None
+        try:
+            for chunk in chunks:
+                text = parser.feed(chunk)
+                if text:
+                    yield sse_event("chunk", {"text": text})
+                if parser.metrics is not None and not metrics_sent:
+                    yield sse_event("metrics", parser.metrics)
+                    metrics_sent = True
+
+            text, ai_reply = parser.finish()
+            if text:
+                yield sse_event("chunk", {"text": text})
+            if not ai_reply:
+                raise ValueError("Empty counter-argument")
+
+            # Parsed, salvaged or local metrics; never another call
+            metrics = resolve_stream_metrics(parser, argument)
+            if not metrics_sent:
+                yield sse_event("metrics", metrics)
+
+            body = finish_turn(turn, ai_reply, metrics)
+            yield sse_event("done", body)
+
+        except RateLimitExceeded as e:
+            error = e
+            print("DEBATE STREAM RATE LIMITED:", e)
+            yield sse_event("error", {
+                "error": "AI service is busy, please retry shortly",
+                "retry_after": retry_after_seconds(e)
+            })
+
+        except Exception as e:
+            error = e
+            print("DEBATE STREAM ERROR:", e)
+            yield sse_event("error", {"error": "AI quota exceeded or internal error"})
+
+        finally:
+            # Duplicates waiting on this turn need an outcome even if the client disconnected
+            if body is None and error is None:
+                error = RuntimeError("Debate stream closed before completion")
+            release_turn(turn, flight, body, error)
+
+    return event_stream(stream_with_context(events()))
+
+def load_summary_session(current_user, session_id, debate_ids):
+    """
+    The session holding exactly these turns
+
+    Args:
+        current_user: Owner of the debates
+        session_id: Session from the request; looked up from the last turn if absent
+        debate_ids: Turns the summary is for
+
+    Returns:
+        DebateSession, or None if the turns have to be read instead
+    """
+    if not session_id:
+        last_turn = debates_collection.find_one(
+            {"_id": ObjectId(debate_ids[-1]), "user_id": current_user},
+            {"session_id": 1}
+        )
+        session_id = last_turn.get("session_id") if last_turn else None
+        if not session_id:
+            return None
+
+    session = session_cache.load(session_id, current_user)
+    if not session or set(session.debate_ids) != set(debate_ids):
+        return None
+    return session
+
+def run_summary_job(job):
+    """Job handler: judge the debate and store the summary"""
+    payload = job["payload"]
+    current_user = payload["user_id"]
+    debate_ids = payload["debate_ids"]
+
+    session = load_summary_session(current_user, payload.get("session_id"), debate_ids)
+    judge_state = session.judge_state if session else None
+
+    if judge_state is None:
+        # Turns without a (matching) session: rebuild the state from the transcript
         debates = list(debates_collection.find({
             "_id": {"$in": [ObjectId(id) for id in debate_ids]},
             "user_id": current_user
         }).sort("created_at", 1))
 
         if not debates:
-            return jsonify({"error": "No debates found"}), 404
+            raise ValueError("No debates found")
 
-        debate_data = {
-            "topic": topic,
-            "user_arguments": [d["user_argument"] for d in debates],
-            "ai_responses": [d["ai_response"] for d in debates],
-            "metrics": [d.get("metrics", {}) for d in debates],
-            "drift_scores": [d.get("drift_score", 0) for d in debates],
-            "difficulty_level": debates[-1].get("difficulty_level", 3)
-        }
+        judge_state = JudgeState.from_debates(debates)
 
-        def summary_call(api_key):
-            return generate_debate_summary(api_key, debate_data)
+    debate_data = {
+        "topic": payload["topic"],
+        "difficulty_level": judge_state.difficulty_level
+    }
 
-        summary = api_manager.call_with_retry(summary_call, key_type="judge")
+    def summary_call(api_key):
+        return generate_debate_summary(api_key, debate_data, judge_state)
 
-        summary_doc = {
-            "user_id": current_user,
-            "topic": topic,
-            "debate_ids": debate_ids,
-            "summary": summary,
-            "created_at": datetime.now(timezone.utc)
-        }
+    prompt_text = judge_state.digest_text() + judge_state.recent_text()
+    summary = api_manager.call_with_retry(
+        summary_call, key_type="judge", tokens=estimate_tokens(prompt_text) + SUMMARY_CALL_TOKENS,
+        deadline=SUMMARY_QUEUE_DEADLINE
+    )
 
-        result_db = summaries_collection.insert_one(summary_doc)
-        summary_id = str(result_db.inserted_id)
+    summary_doc = {
+        "user_id": current_user,
+        "topic": payload["topic"],
+        "debate_ids": debate_ids,
+        "session_id": session.session_id if session else None,
+        "summary": summary,
+        "created_at": datetime.now(timezone.utc)
+    }
 
-        return jsonify({
-            "summary_id": summary_id,
-            "summary": summary
-        })
+    result_db = summaries_collection.insert_one(summary_doc)
+    summary_id = str(result_db.inserted_id)
+    user_stats.record_summary(
+        stats_writer, current_user, summary.get("overall_score", 0), summary_doc["created_at"]
+    )
+
+    if session:
+        sessions_collection.update_one({"_id": session.id}, {"$set": {"summary_id": summary_id}})
+
+    return {
+        "summary_id": summary_id,
+        "summary": summary
+    }
+
+# Summaries run on background workers; jobs live in Mongo so they outlast a restart
+SUMMARY_JOB_POLL = float(os.getenv("SUMMARY_JOB_POLL", 1.0))
+# Clients poll the job; the event stream only covers the first few seconds so it never pins a worker
+SUMMARY_EVENTS_TIMEOUT = min(float(os.getenv("SUMMARY_EVENTS_TIMEOUT", 5)), 10.0)
+summary_jobs = JobQueue(
+    summary_jobs_collection,
+    run_summary_job,
+    workers=int(os.getenv("SUMMARY_WORKERS", 2)),
+    lease_seconds=float(os.getenv("SUMMARY_JOB_LEASE", 180)),
+    poll_interval=SUMMARY_JOB_POLL,
+    max_attempts=int(os.getenv("SUMMARY_JOB_ATTEMPTS", 5))
+)
+summary_jobs.start()
+atexit.register(summary_jobs.stop)
+
+def summary_job_view(job):
+    body = {
+        "job_id": str(job["_id"]),
+        "status": job["status"],
+        "attempts": job.get("attempts", 0),
+        "created_at": job["created_at"],
+        "finished_at": job.get("finished_at")
+    }
+    if job["status"] == "done":
+        body.update(job["result"])
+    elif job.get("error"):
+        body["error"] = job["error"]
+    return body
+
+def find_summary_job(current_user, job_id):
+    try:
+        return summary_jobs.get(ObjectId(job_id), {"payload.user_id": current_user})
+    except Exception:
+        return None
+
+@app.route("/api/debate/summary", methods=["POST"])
+@jwt_required()
+def generate_summary():
+    current_user = get_jwt_identity()
+
+    data = request.json or {}
+    topic = data.get("topic")
+    debate_ids = data.get("debate_ids", [])
+    session_id = data.get("session_id")
+
+    if not api_manager:
+        return jsonify({"error": "AI service unavailable"}), 503
+
+    try:
+        if session_id and not debate_ids:
+            # The session document already lists its turns
+            session = session_cache.load(session_id, current_user)
+            if not session:
+                return jsonify({"error": "Session not found"}), 404
+            topic = topic or session.topic
+            debate_ids = session.debate_ids
+
+        if not topic or not debate_ids:
+            return jsonify({"error": "Topic and debate_ids required"}), 400
+
+        if not all(ObjectId.is_valid(id) for id in debate_ids):
+            return jsonify({"error": "Invalid debate id"}), 400
+
+        job, created = summary_jobs.enqueue(
+            prompt_key(current_user, *sorted(debate_ids)),
+            {
+                "user_id": current_user,
+                "topic": topic,
+                "debate_ids": debate_ids,
+                "session_id": session_id
+            }
+        )
+        print(f"🧾 Summary job {job['_id']} ({'queued' if created else 'deduplicated'}, {job['status']})")
+
+        body = summary_job_view(job)
+        return jsonify(body), 200 if job["status"] == "done" else 202
 
     except Exception as e:
         print("SUMMARY ERROR:", e)
         return jsonify({"error": str(e)}), 500
 
+@app.route("/api/debate/summary/jobs/<job_id>", methods=["GET"])
+@jwt_required()
+def get_summary_job(job_id):
+    current_user = get_jwt_identity()
+
+    job = find_summary_job(current_user, job_id)
+    if not job:
+        return jsonify({"error": "Summary job not found"}), 404
+
+    return jsonify(summary_job_view(job))
+
+@app.route("/api/debate/summary/jobs/<job_id>/events", methods=["GET"])
+@jwt_required()
+def summary_job_events(job_id):
+    """SSE: status on every change, then done (with the summary) or error"""
+    current_user = get_jwt_identity()
+
+    job = find_summary_job(current_user, job_id)
+    if not job:
+        return jsonify({"error": "Summary job not found"}), 404
+
+    def events():
+        current = job
+        last_status = None
+        deadline = datetime.now(timezone.utc) + timedelta(seconds=SUMMARY_EVENTS_TIMEOUT)
+
+        while True:
+            body = summary_job_view(current)
+            if body["status"] != last_status:
+                last_status = body["status"]
+                yield sse_event("status", {"job_id": body["job_id"], "status": last_status})
+
+            if last_status == "done":
+                yield sse_event("done", body)
+                return
+            if last_status == "failed":
+                yield sse_event("error", {"error": body.get("error", "Summary failed")})
+                return
+            if datetime.now(timezone.utc) >= deadline:
+                # Client falls back to polling the job
+                yield sse_event("timeout", {"job_id": body["job_id"], "status": last_status})
+                return
+
+            summary_jobs.wait(SUMMARY_JOB_POLL)
+            current = find_summary_job(current_user, job_id) or current
+
+    return event_stream(stream_with_context(events()))
+
+# Stored debates and summaries never change, so their ObjectId is a strong ETag
+IMMUTABLE_CACHE_CONTROL = "private, max-age=31536000, immutable"
+# Documents are sized deeply, so the byte budget holds however long the debates run
+stored_documents = LRUCache(
+    max_entries=int(os.getenv("DOCUMENT_CACHE_ITEMS", 500)),
+    max_bytes=int(os.getenv("DOCUMENT_CACHE_MAX_BYTES", 32 * 1024 * 1024))
+)
+
+def stored_document_response(collection, kind, document_id, current_user):
+    """
+    A debate or summary by id, served from the in-process cache when hot.
+    Answers If-None-Match with 304 once ownership is confirmed.
+    """
+    etag = str(ObjectId(document_id))
+    key = f"{kind}:{etag}"
+
+    document = stored_documents.get(key)
+    if document is None:
+        document = collection.find_one({"_id": ObjectId(etag)})
+        if document:
+            document["_id"] = etag
+            stored_documents.put(key, document)
+
+    if not document or document.get("user_id") != current_user:
+        return jsonify({"error": f"{kind.capitalize()} not found"}), 404
+
+    # Weak comparison: compressed responses carry W/"<id>"
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    else:
+        response = jsonify(document)
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+    response.headers["Vary"] = "Authorization"
+    return response
+
 @app.route("/api/debate/history/<debate_id>", methods=["GET"])
 @jwt_required()
 def get_debate_history(debate_id):
     current_user = get_jwt_identity()
 
     try:
-        debate = debates_collection.find_one({
-            "_id": ObjectId(debate_id),
-            "user_id": current_user
-        })
-
-        if not debate:
-            return jsonify({"error": "Debate not found"}), 404
-
-        debate["_id"] = str(debate["_id"])
-        return jsonify(debate)
+        return stored_document_response(debates_collection, "debate", debate_id, current_user)
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -291,48 +918,120 @@ def get_summary(summary_id):
     current_user = get_jwt_identity()
 
     try:
-        summary = summaries_collection.find_one({
-            "_id": ObjectId(summary_id),
-            "user_id": current_user
-        })
-
-        if not summary:
-            return jsonify({"error": "Summary not found"}), 404
-
-        summary["_id"] = str(summary["_id"])
-        return jsonify(summary)
+        return stored_document_response(summaries_collection, "summary", summary_id, current_user)
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-@app.route("/api/dashboard", methods=["GET"])
+# List views carry scores and a topic preview; full text comes from the per-item endpoints
+TOPIC_PREVIEW_CHARS = 80
+DEFAULT_PAGE_SIZE = 20
+HISTORY_VIEWS = {
+    "list": {
+        "topic": 1, "session_id": 1, "difficulty_level": 1, "drift_score": 1,
+        "turn_score": 1, "metrics": 1, "created_at": 1
+    },
+    "full": None
+}
+SUMMARY_VIEWS = {
+    "list": {"topic": 1, "session_id": 1, "created_at": 1, "summary.overall_score": 1, "summary.breakdown": 1},
+    "full": None
+}
+
+def preview(text):
+    if not text or len(text) <= TOPIC_PREVIEW_CHARS:
+        return text
+    return text[:TOPIC_PREVIEW_CHARS].rstrip() + "…"
+
+def list_item(doc, view):
+    doc["_id"] = str(doc["_id"])
+    if view == "list":
+        doc["topic"] = preview(doc.get("topic"))
+    return doc
+
+def page_args(views):
+    """view, limit and cursor query parameters; raises ValueError on an unknown view"""
+    view = request.args.get("view", "list")
+    if view not in views:
+        raise ValueError(f"Unknown view: {view}")
+    return view, page_size(request.args.get("limit"), DEFAULT_PAGE_SIZE), request.args.get("cursor")
+
+def summaries_page(current_user, view, limit, cursor=None):
+    docs, next_cursor = keyset_page(
+        summaries_collection, {"user_id": current_user}, SUMMARY_VIEWS[view], "created_at", limit, cursor
+    )
+    return [list_item(doc, view) for doc in docs], next_cursor
+
+def sessions_page(current_user, limit, cursor=None):
+    docs, next_cursor = keyset_page(
+        sessions_collection, {"user_id": current_user}, OVERVIEW_PROJECTION, "created_at", limit, cursor
+    )
+    sessions = [DebateSession(doc).overview() for doc in docs]
+    for session in sessions:
+        session["topic"] = preview(session["topic"])
+    return sessions, next_cursor
+
+@app.route("/api/debate/history", methods=["GET"])
 @jwt_required()
-def dashboard():
+def list_debate_history():
     current_user = get_jwt_identity()
 
-    debates = list(
-        debates_collection.find(
-            {
-                "user_id": current_user,
-                "ai_response": {"$exists": True, "$ne": ""}
-            },
-            {"_id": 0}
-        ).sort("created_at", -1).limit(50)
-    )
+    try:
+        view, limit, cursor = page_args(HISTORY_VIEWS)
+        docs, next_cursor = keyset_page(
+            debates_collection, {"user_id": current_user}, HISTORY_VIEWS[view], "created_at", limit, cursor
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
-    summaries = list(
-        summaries_collection.find(
-            {"user_id": current_user},
-            {"_id": 1, "topic": 1, "created_at": 1, "summary": 1}
-        ).sort("created_at", -1).limit(20)
-    )
+    return jsonify({
+        "debates": [list_item(doc, view) for doc in docs],
+        "next_cursor": next_cursor
+    })
+
+@app.route("/api/debate/summaries", methods=["GET"])
+@jwt_required()
+def list_summaries():
+    current_user = get_jwt_identity()
+
+    try:
+        view, limit, cursor = page_args(SUMMARY_VIEWS)
+        summaries, next_cursor = summaries_page(current_user, view, limit, cursor)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify({"summaries": summaries, "next_cursor": next_cursor})
+
+@app.route("/api/debate/sessions", methods=["GET"])
+@jwt_required()
+def list_sessions():
+    current_user = get_jwt_identity()
+
+    try:
+        sessions, next_cursor = sessions_page(
+            current_user, page_size(request.args.get("limit"), DEFAULT_PAGE_SIZE), request.args.get("cursor")
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify({"sessions": sessions, "next_cursor": next_cursor})
+
+@app.route("/api/dashboard", methods=["GET"])
+@jwt_required()
+def dashboard():
+    current_user = get_jwt_identity()
 
-    for s in summaries:
-        s["_id"] = str(s["_id"])
+    # Per-user and per-session aggregates are maintained on every turn, so no turn scan here
+    stats = user_stats.stats_view(user_stats_collection.find_one({"_id": current_user}))
+    sessions, sessions_cursor = sessions_page(current_user, DEFAULT_PAGE_SIZE)
+    summaries, summaries_cursor = summaries_page(current_user, "list", DEFAULT_PAGE_SIZE)
 
     return jsonify({
-        "debates": debates,
-        "summaries": summaries
+        "stats": stats,
+        "sessions": sessions,
+        "sessions_cursor": sessions_cursor,
+        "summaries": summaries,
+        "summaries_cursor": summaries_cursor
     })
 
 @app.route("/api/health", methods=["GET"])
@@ -346,7 +1045,18 @@ def health_check():
         return jsonify({
             "status": "healthy",
             "api_keys": key_status,
-            "cache_stats": cache_stats
+            "cache_stats": cache_stats,
+            "drift_scoring": get_drift_stats(),
+            "response_parsing": get_response_stats(),
+            "summary_jobs": summary_jobs.get_stats(),
+            "session_cache": session_cache.get_stats(),
+            "document_cache": stored_documents.get_stats(),
+            "json_backend": json_backend(),
+            "compression": compressor.get_stats(),
+            "write_behind": {
+                "debate_logs": audit_writer.get_stats(),
+                "user_stats": stats_writer.get_stats()
+            }
         })
     except Exception as e:
         return jsonify({
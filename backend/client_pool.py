@@ -0,0 +1,139 @@
+"""
+Client Pool - Shared genai.Client Instances
+One long-lived client per API key with keep-alive HTTP connections
+"""
+
+import json 
+import os 
+import threading 
+from typing import Dict 
+
+import google .genai as genai 
+import requests 
+from requests .adapters import HTTPAdapter 
+
+
+SUPPORTED_SDK_VERSION ="0.3."
+
+
+def _bind_session (client :genai .Client ,session :requests .Session ,timeout )->bool :
+    """
+    Route the client's API-key requests through a persistent session
+
+    google-genai 0.3.x builds a new requests.Session for every call, which
+    throws away pooled connections and TLS sessions. This swaps in a
+    session-backed transport on this client instance only. The patch
+    replaces the private _api_client._request_unauthorized as of
+    google-genai 0.3.0 (pinned in requirements.txt); any other SDK version
+    is left as it is.
+
+    Returns:
+        True if the session was bound
+    """
+    if not getattr (genai ,"__version__","").startswith (SUPPORTED_SDK_VERSION ):
+        return False 
+
+    try :
+        from google .genai import _api_client ,errors 
+    except ImportError :
+        return False 
+
+    api_client =getattr (client ,"_api_client",None )
+    if api_client is None or api_client .vertexai or not hasattr (api_client ,"_request_unauthorized"):
+        return False 
+
+    def _request_unauthorized (http_request ,stream =False ):
+        data =None 
+        if http_request .data :
+            if not isinstance (http_request .data ,bytes ):
+                data =json .dumps (http_request .data ,cls =_api_client .RequestJsonEncoder )
+            else :
+                data =http_request .data 
+
+        response =session .request (
+        http_request .method ,
+        http_request .url ,
+        headers =http_request .headers ,
+        data =data ,
+        stream =stream ,
+        timeout =timeout 
+        )
+        errors .APIError .raise_for_response (response )
+        return _api_client .HttpResponse (
+        response .headers ,response if stream else [response .text ]
+        )
+
+    api_client ._request_unauthorized =_request_unauthorized 
+    return True 
+
+
+class ClientPool :
+    """
+    Thread-safe, process-wide pool of genai.Client objects keyed by API key.
+
+    Each client gets its own requests.Session whose connection pool is capped
+    at GEMINI_MAX_CONNECTIONS_PER_KEY; callers past the cap wait for a free
+    connection instead of opening new ones.
+    """
+
+    def __init__ (self ):
+        self .max_connections =int (os .getenv ("GEMINI_MAX_CONNECTIONS_PER_KEY",10 ))
+        timeout =os .getenv ("GEMINI_HTTP_TIMEOUT","60")
+        self .timeout =float (timeout )if timeout else None 
+
+        self ._clients :Dict [str ,genai .Client ]={}
+        self ._sessions :Dict [str ,requests .Session ]={}
+        self ._lock =threading .Lock ()
+
+        self .hits =0 
+        self .misses =0 
+
+    def _new_session (self )->requests .Session :
+        session =requests .Session ()
+        adapter =HTTPAdapter (
+        pool_connections =1 ,
+        pool_maxsize =self .max_connections ,
+        pool_block =True 
+        )
+        session .mount ("https://",adapter )
+        session .mount ("http://",adapter )
+        return session 
+
+    def get (self ,api_key :str )->genai .Client :
+        """Get the shared client for an API key, creating it on first use"""
+        client =self ._clients .get (api_key )
+        if client is not None :
+            self .hits +=1 
+            return client 
+
+        with self ._lock :
+            client =self ._clients .get (api_key )
+            if client is None :
+                self .misses +=1 
+                client =genai .Client (api_key =api_key )
+                session =self ._new_session ()
+                if _bind_session (client ,session ,self .timeout ):
+                    self ._sessions [api_key ]=session 
+                else :
+                    session .close ()
+                self ._clients [api_key ]=client 
+            else :
+                self .hits +=1 
+            return client 
+
+    def close (self ):
+        """Drop all clients and close their connections"""
+        with self ._lock :
+            for session in self ._sessions .values ():
+                session .close ()
+            self ._sessions ={}
+            self ._clients ={}
+
+    def get_stats (self )->dict :
+        return {
+        "clients":len (self ._clients ),
+        "keep_alive_sessions":len (self ._sessions ),
+        "max_connections_per_key":self .max_connections ,
+        "hits":self .hits ,
+        "misses":self .misses 
+        }
@@ -3,52 +3,57 @@ AI Judge System - Compatible with google-genai (latest SDK)
 """
 
 import json 
-import google .genai as genai 
+from api_manager import get_client 
 from google .genai import types 
-from typing import List ,Dict 
+from typing import List ,Dict ,Optional 
 
+from intelligence .judge_state import JudgeState 
 
-def generate_debate_summary (api_key :str ,debate_data :Dict )->Dict :
+
+def generate_debate_summary (api_key :str ,debate_data :Dict ,judge_state :Optional [JudgeState ]=None )->Dict :
     """
     Generate comprehensive AI judge summary after debate
     
     Args:
         api_key: Gemini API key
         debate_data: Dict with topic, arguments, responses, metrics, etc.
+        judge_state: Rolling session state; when given, only its digest and
+            recent turns are sent and debate_data needs just topic and
+            difficulty_level
     
     Returns:
         Dict with overall_score, breakdown, feedback, etc.
     """
 
-    transcript =[]
-    for i ,(user_arg ,ai_resp )in enumerate (zip (
-    debate_data .get ("user_arguments",[]),
-    debate_data .get ("ai_responses",[])
-    )):
-        transcript .append (f"Turn {i +1 }:")
-        transcript .append (f"User: {user_arg }")
-        transcript .append (f"AI: {ai_resp }")
-        transcript .append ("")
-
-    full_transcript ="\n".join (transcript )
-
-
-    metrics_list =debate_data .get ("metrics",[])
-    avg_coherence =sum (m .get ("logical_coherence",0 )for m in metrics_list )/len (metrics_list )if metrics_list else 0 
-    avg_vocab =sum (m .get ("vocabulary_level",0 )for m in metrics_list )/len (metrics_list )if metrics_list else 0 
-    avg_aggression =sum (m .get ("aggression_level",0 )for m in metrics_list )/len (metrics_list )if metrics_list else 0 
-    total_fallacies =sum (m .get ("fallacy_count",0 )for m in metrics_list )
-
-    drift_scores =debate_data .get ("drift_scores",[])
-    avg_drift =sum (drift_scores )/len (drift_scores )if drift_scores else 0 
+    if judge_state is None :
+        judge_state =JudgeState ()
+        for user_arg ,ai_resp ,metrics ,drift_score in zip (
+        debate_data .get ("user_arguments",[]),
+        debate_data .get ("ai_responses",[]),
+        debate_data .get ("metrics",[]),
+        debate_data .get ("drift_scores",[])
+        ):
+            judge_state .update (user_arg ,ai_resp ,metrics ,drift_score ,debate_data .get ("difficulty_level",3 ))
+
+    averages =judge_state .averages ()
+    avg_coherence =averages ["avg_coherence"]
+    avg_vocab =averages ["avg_vocab"]
+    avg_aggression =averages ["avg_aggression"]
+    total_fallacies =averages ["total_fallacies"]
+    avg_drift =averages ["avg_drift"]
+
+    earlier_turns =judge_state .digest_text ()
+    transcript =judge_state .recent_text ()
+    if earlier_turns :
+        transcript =f"EARLIER TURNS (condensed):\n{earlier_turns }\n\nRECENT TURNS:\n{transcript }"
 
     prompt =f"""You are an expert debate judge. Analyze this performance.
 
 DEBATE TOPIC: {debate_data .get ('topic','N/A')}
 DIFFICULTY LEVEL: {debate_data .get ('difficulty_level',3 )}/5
 
-TRANSCRIPT:
-{full_transcript }
+TRANSCRIPT ({judge_state .turns } turns):
+{transcript }
 
 METRICS:
 - Avg Logical Coherence: {avg_coherence :.1f}/10
@@ -95,7 +100,7 @@ Make feedback specific with examples. Respond with ONLY JSON, no markdown."""
 
     try :
 
-        client =genai .Client (api_key =api_key )
+        client =get_client (api_key )
 
 
         response =client .models .generate_content (
@@ -3,8 +3,83 @@ Argument Analyzer - Compatible with google-genai (latest SDK)
 """
 
 import json 
-import google .genai as genai 
+import os 
+import threading 
+from collections import Counter 
+from api_manager import get_client 
 from google .genai import types 
+from utils .single_flight import SingleFlight ,prompt_key 
+from intelligence .local_metrics import compute_local_metrics 
+from intelligence .response_parser import (
+normalize_metrics ,
+parse_combined_response ,
+parse_structured_response ,
+salvage_combined_response ,
+salvage_metrics 
+)
+
+
+_generation_flights =SingleFlight ()
+
+_response_paths =Counter ()
+_paths_lock =threading .Lock ()
+
+DEBATE_RESPONSE_MODE =os .getenv ("DEBATE_RESPONSE_MODE","text").lower ()
+ARGUMENT_METRICS_MODE =os .getenv ("ARGUMENT_METRICS_MODE","llm").lower ()
+
+DEBATE_RESPONSE_SCHEMA =types .Schema (
+type ="OBJECT",
+properties ={
+"ai_response":types .Schema (type ="STRING"),
+"metrics":types .Schema (
+type ="OBJECT",
+properties ={
+"logical_coherence":types .Schema (type ="INTEGER",minimum =1 ,maximum =10 ),
+"vocabulary_level":types .Schema (type ="INTEGER",minimum =1 ,maximum =10 ),
+"aggression_level":types .Schema (type ="INTEGER",minimum =1 ,maximum =10 ),
+"fallacy_count":types .Schema (type ="INTEGER",minimum =0 )
+},
+required =["logical_coherence","vocabulary_level","aggression_level","fallacy_count"]
+)
+},
+required =["ai_response","metrics"],
+property_ordering =["ai_response","metrics"]
+)
+
+STRUCTURED_CONFIG =types .GenerateContentConfig (
+response_mime_type ="application/json",
+response_schema =DEBATE_RESPONSE_SCHEMA 
+)
+
+
+def _generate (client ,prompt :str ,config =None ):
+    """generate_content, shared with any identical prompt already in flight"""
+    return _generation_flights .do (
+    prompt_key ("gemini-2.5-flash-lite","json"if config else "text",prompt ),
+    lambda :client .models .generate_content (
+    model ='gemini-2.5-flash-lite',
+    contents =prompt ,
+    config =config 
+    )
+    )
+
+
+def record_response_path (path :str ):
+    """Count how a debate response was obtained (parsed, salvaged, fallback)"""
+    with _paths_lock :
+        _response_paths [path ]+=1 
+
+
+def get_response_stats ()->dict :
+    with _paths_lock :
+        paths =dict (_response_paths )
+    total =sum (paths .values ())
+    return {
+    "mode":DEBATE_RESPONSE_MODE ,
+    "metrics_mode":ARGUMENT_METRICS_MODE ,
+    "paths":paths ,
+    "fallback_rate":round (paths .get ("fallback",0 )/total ,3 )if total else 0.0 
+    }
 
 
 def analyze_argument (api_key :str ,argument_text :str )->dict :
@@ -36,13 +111,10 @@ JSON Response:"""
 
     try :
 
-        client =genai .Client (api_key =api_key )
+        client =get_client (api_key )
 
 
-        response =client .models .generate_content (
-        model ='gemini-2.5-flash-lite',
-        contents =prompt 
-        )
+        response =_generate (client ,prompt )
 
 
         response_text =response .text .strip ()
@@ -70,34 +142,17 @@ JSON Response:"""
         return metrics 
 
     except Exception as e :
-        print (f"⚠️  Argument analysis failed: {e }")
+        print (f"⚠️  Argument analysis failed, using local metrics: {e }")
 
-        return {
-        "logical_coherence":5 ,
-        "vocabulary_level":5 ,
-        "aggression_level":5 ,
-        "fallacy_count":0 
-        }
+        return compute_local_metrics (argument_text )
 
 
-def analyze_with_response (api_key :str ,topic :str ,argument :str ,difficulty :int )->dict :
-    """
-    OPTIMIZED: Combines argument analysis with AI response in single call
-    
-    Args:
-        api_key: Gemini API key
-        topic: Debate topic
-        argument: User's argument
-        difficulty: Current difficulty level (1-5)
-    
-    Returns:
-        Dict with ai_response and metrics
-    """
+def _combined_prompt (topic :str ,argument :str ,difficulty :int )->str :
     from intelligence .prompt_controller import get_debate_prompt 
 
     system_instruction =get_debate_prompt (difficulty )
 
-    prompt =f"""{system_instruction }
+    return f"""{system_instruction }
 
 Debate Topic: "{topic }"
 User Argument: "{argument }"
@@ -123,61 +178,129 @@ Remember:
 - Analysis must be valid JSON
 - No extra text outside sections"""
 
-    try :
 
-        client =genai .Client (api_key =api_key )
+def _counter_prompt (topic :str ,argument :str ,difficulty :int )->str :
+    from intelligence .prompt_controller import get_debate_prompt 
 
+    return f"""{get_debate_prompt (difficulty )}
 
-        response =client .models .generate_content (
-        model ='gemini-2.5-flash-lite',
-        contents =prompt 
-        )
-        response_text =response .text .strip ()
+Debate Topic: "{topic }"
+User Argument: "{argument }"
+
+Respond with ONLY your counter-argument. Be clear and conversational."""
 
 
-        parts =response_text .split ("ANALYSIS:")
+def _structured_prompt (topic :str ,argument :str ,difficulty :int )->str :
+    from intelligence .prompt_controller import get_debate_prompt 
 
-        if len (parts )==2 :
-            counter_arg =parts [0 ].replace ("COUNTER_ARGUMENT:","").strip ()
-            analysis_text =parts [1 ].strip ()
+    return f"""{get_debate_prompt (difficulty )}
 
+Debate Topic: "{topic }"
+User Argument: "{argument }"
 
-            if "```"in analysis_text :
-                analysis_text =analysis_text .split ("```")[1 ]
-                if analysis_text .startswith ("json"):
-                    analysis_text =analysis_text [4 :]
-            analysis_text =analysis_text .strip ()
+Respond with a JSON object:
+- ai_response: your counter-argument (clear, focused, conversational)
+- metrics: analysis of the user's argument (logical_coherence, vocabulary_level and aggression_level from 1-10, fallacy_count as an integer)"""
 
-            metrics =json .loads (analysis_text )
 
+def analyze_with_response (api_key :str ,topic :str ,argument :str ,difficulty :int )->dict :
+    """
+    OPTIMIZED: Combines argument analysis with AI response in single call
+    
+    Args:
+        api_key: Gemini API key
+        topic: Debate topic
+        argument: User's argument
+        difficulty: Current difficulty level (1-5)
+    
+    Returns:
+        Dict with ai_response and metrics
+    """
+    client =get_client (api_key )
+    local_metrics =compute_local_metrics (argument )
+
+    if ARGUMENT_METRICS_MODE =="local":
+        response =_generate (client ,_counter_prompt (topic ,argument ,difficulty ))
+        ai_response =(response .text or "").strip ()
+        if ai_response :
+            record_response_path ("local_metrics")
             return {
-            "ai_response":counter_arg ,
-            "metrics":metrics 
+            "ai_response":ai_response ,
+            "metrics":local_metrics 
             }
-        else :
-            raise ValueError ("Response format incorrect")
+        result =None 
 
-    except Exception as e :
-        print (f"⚠️  Combined analysis failed, using fallback: {e }")
+    elif DEBATE_RESPONSE_MODE =="structured":
+        response =_generate (client ,_structured_prompt (topic ,argument ,difficulty ),STRUCTURED_CONFIG )
+        result ,salvaged =parse_structured_response ((response .text or "").strip (),local_metrics )
+    else :
+        response =_generate (client ,_combined_prompt (topic ,argument ,difficulty ))
+        response_text =(response .text or "").strip ()
+        try :
+            result ,salvaged =parse_combined_response (response_text ),False 
+        except ValueError as e :
+            print (f"⚠️  Combined response malformed, salvaging: {e }")
+            result ,salvaged =salvage_combined_response (response_text ,local_metrics ),True 
 
+    if result is not None :
+        record_response_path (f"{DEBATE_RESPONSE_MODE }_{'salvaged'if salvaged else 'parsed'}")
+        return result 
 
-        debate_prompt =f"""{get_debate_prompt (difficulty )}
+    print ("⚠️  No counter-argument in response, using fallback")
+    record_response_path ("fallback")
 
-Debate Topic: "{topic }"
-User Argument: "{argument }"
+    ai_response_result =_generate (client ,_counter_prompt (topic ,argument ,difficulty ))
+    ai_response =ai_response_result .text .strip ()
 
-Respond with ONLY your counter-argument. Be clear and conversational."""
+    return {
+    "ai_response":ai_response ,
+    "metrics":local_metrics 
+    }
+
+
+def _stream_text (first ,stream ):
+    if first is not None and first .text :
+        yield first .text 
+    for chunk in stream :
+        if chunk .text :
+            yield chunk .text 
+
+
+def open_response_stream (api_key :str ,topic :str ,argument :str ,difficulty :int ):
+    """
+    Stream the combined counter-argument + analysis response
+
+    The first chunk is fetched before returning, so connection and quota
+    errors surface to the caller (e.g. call_with_retry) instead of mid-stream.
 
-        client =genai .Client (api_key =api_key )
-        ai_response_result =client .models .generate_content (
-        model ='gemini-2.5-flash-lite',
-        contents =debate_prompt 
-        )
-        ai_response =ai_response_result .text .strip ()
+    Returns:
+        Iterator of text chunks, to be parsed with CombinedResponseParser
+    """
+    client =get_client (api_key )
+    if ARGUMENT_METRICS_MODE =="local":
+        prompt =_counter_prompt (topic ,argument ,difficulty )
+    else :
+        prompt =_combined_prompt (topic ,argument ,difficulty )
+    stream =client .models .generate_content_stream (
+    model ='gemini-2.5-flash-lite',
+    contents =prompt 
+    )
+    return _stream_text (next (stream ,None ),stream )
+
+
+def resolve_stream_metrics (parser ,argument :str )->dict :
+    """
+    Metrics for a finished stream: the parsed ANALYSIS block, whatever of it
+    is readable, or the local engine (always, in local metrics mode)
+    """
+    local_metrics =compute_local_metrics (argument )
+    if ARGUMENT_METRICS_MODE =="local":
+        record_response_path ("stream_local_metrics")
+        return local_metrics 
 
-        metrics =analyze_argument (api_key ,argument )
+    if parser .metrics is not None :
+        record_response_path ("stream_parsed")
+        return normalize_metrics (parser .metrics ,local_metrics )
 
-        return {
-        "ai_response":ai_response ,
-        "metrics":metrics 
-        }
+    record_response_path ("stream_salvaged")
+    return salvage_metrics (parser .analysis_text ,local_metrics )or local_metrics 
@@ -1,23 +1,153 @@
-def compute_cosine_similarity(vec1, vec2):
+import threading
+import weakref
+
+import numpy as np
+
+
+# Norms of stored (read-only) embeddings, keyed by array identity
+_norm_cache = {}
+_norm_lock = threading.Lock()
+
+
+def _as_vector(vec):
+    return np.asarray(vec, dtype=np.float32)
+
+
+def _as_matrix(vectors):
+    """Stack vectors (or pass through a 2-D array) as a float32 matrix."""
+    if isinstance(vectors, np.ndarray) and vectors.ndim == 2:
+        return vectors.astype(np.float32, copy=False)
+    return np.vstack([_as_vector(v) for v in vectors]) if len(vectors) else np.zeros((0, 0), np.float32)
+
+
+def vector_norm(vec):
     """
-    Computes cosine similarity between two embedding vectors.
-    Pure Python - no dependencies!
-    Returns a float between 0 and 1.
+    L2 norm of an embedding.
+    Read-only arrays (everything the embedding cache/store hands out) get
+    their norm computed once and remembered for the lifetime of the array.
     """
-    
-    # Dot product
-    dot_product = sum(a * b for a, b in zip(vec1, vec2))
-    
-    # Magnitudes
-    magnitude1 = sum(a * a for a in vec1) ** 0.5
-    magnitude2 = sum(b * b for b in vec2) ** 0.5
-    
+    if not isinstance(vec, np.ndarray) or vec.flags.writeable:
+        return float(np.linalg.norm(_as_vector(vec)))
+
+    key = id(vec)
+    entry = _norm_cache.get(key)
+    if entry is not None and entry[0]() is vec:
+        return entry[1]
+
+    norm = float(np.linalg.norm(_as_vector(vec)))
+    with _norm_lock:
+        ref = weakref.ref(vec, lambda _, key=key: _norm_cache.pop(key, None))
+        _norm_cache[key] = (ref, norm)
+    return norm
+
+
+def _row_norms(matrix):
+    norms = np.linalg.norm(matrix, axis=1)
+    norms[norms == 0] = np.inf  # zero vectors score 0 instead of dividing by zero
+    return norms
+
+
+def cosine_one_to_many(query, vectors, norms=None):
+    """
+    Cosine similarity of one vector against many (e.g. topic vs every turn).
+    Returns a float32 array clamped to [0, 1].
+    """
+    matrix = _as_matrix(vectors)
+    if matrix.size == 0:
+        return np.zeros(0, dtype=np.float32)
+
+    query_norm = vector_norm(query)
+    if query_norm == 0:
+        return np.zeros(matrix.shape[0], dtype=np.float32)
+
+    if norms is None:
+        norms = _row_norms(matrix)
+
+    similarities = (matrix @ _as_vector(query)) / (norms * query_norm)
+    return np.clip(similarities, 0.0, 1.0)
+
+
+def cosine_many_to_many(vectors_a, vectors_b=None):
+    """
+    Pairwise cosine similarity matrix between two sets of vectors
+    (or within one set when vectors_b is omitted), clamped to [0, 1].
+    """
+    a = _as_matrix(vectors_a)
+    b = a if vectors_b is None else _as_matrix(vectors_b)
+    if a.size == 0 or b.size == 0:
+        return np.zeros((a.shape[0], b.shape[0]), dtype=np.float32)
+
+    a_unit = a / _row_norms(a)[:, None]
+    b_unit = a_unit if vectors_b is None else b / _row_norms(b)[:, None]
+    return np.clip(a_unit @ b_unit.T, 0.0, 1.0)
+
+
+class VectorIndex:
+    """
+    Growable matrix of stored vectors with their norms precomputed,
+    for repeated one-to-many scoring against the same set.
+    """
+
+    def __init__(self, dims=None):
+        self.dims = dims
+        self._matrix = np.zeros((0, dims or 0), dtype=np.float32)
+        self._norms = np.zeros(0, dtype=np.float32)
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def add(self, vec):
+        vector = _as_vector(vec)
+        if self.dims is None:
+            self.dims = vector.shape[0]
+            self._matrix = np.zeros((0, self.dims), dtype=np.float32)
+
+        if self._size == self._matrix.shape[0]:
+            capacity = max(8, self._size * 2)
+            matrix = np.zeros((capacity, self.dims), dtype=np.float32)
+            matrix[:self._size] = self._matrix[:self._size]
+            norms = np.zeros(capacity, dtype=np.float32)
+            norms[:self._size] = self._norms[:self._size]
+            self._matrix, self._norms = matrix, norms
+
+        norm = float(np.linalg.norm(vector))
+        self._matrix[self._size] = vector
+        self._norms[self._size] = norm if norm else np.inf
+        self._size += 1
+        return self._size - 1
+
+    def similarities(self, query):
+        """Cosine similarity of query against every stored vector."""
+        return cosine_one_to_many(query, self._matrix[:self._size], self._norms[:self._size])
+
+
+def cosine_one_to_one(vec1, vec2):
+    """Cosine similarity of two vectors, clamped to [0, 1]."""
+
+    # Magnitudes (cached for stored embeddings)
+    magnitude1 = vector_norm(vec1)
+    magnitude2 = vector_norm(vec2)
+
     # Avoid division by zero
     if magnitude1 == 0 or magnitude2 == 0:
         return 0.0
-    
+
+    # Dot product
+    dot_product = float(np.dot(_as_vector(vec1), _as_vector(vec2)))
+
     # Cosine similarity
     similarity = dot_product / (magnitude1 * magnitude2)
-    
+
     # Clamp to [0, 1] and return
     return max(0.0, min(1.0, float(similarity)))
+
+
+def compute_cosine_similarity(vec1, vec2):
+    """
+    Computes cosine similarity between two embedding vectors.
+    Accepts float lists or compact float32 / int8 arrays (int8 vectors
+    only carry direction, which is all cosine needs).
+    Returns a float between 0 and 1.
+    """
+    return cosine_one_to_one(vec1, vec2)
@@ -1,24 +1,30 @@
 # backend/intelligence/drift_policy.py
 
+# Lower bounds of ON_TOPIC, PARTIAL_DRIFT and DRIFTING
+DRIFT_THRESHOLDS = (0.65, 0.5, 0.3)
+
+
 def interpret_drift_score(score):
     """
     Interprets semantic drift score with BALANCED enforcement.
     Lower scores = more off-topic
     """
 
-    if score >= 0.65:
+    on_topic, partial_drift, drifting = DRIFT_THRESHOLDS
+
+    if score >= on_topic:
         return {
             "status": "ON_TOPIC",
             "severity": "NONE"
         }
 
-    elif score >= 0.5:
+    elif score >= partial_drift:
         return {
             "status": "PARTIAL_DRIFT",
             "severity": "LOW"
         }
 
-    elif score >= 0.3:
+    elif score >= drifting:
         return {
             "status": "DRIFTING",
             "severity": "MEDIUM"
@@ -2,31 +2,58 @@
 Drift Service - Optimized with Caching
 """
 
-from intelligence .embedding_engine import generate_embedding 
+from intelligence .embedding_engine import generate_embeddings 
 from intelligence .drift_detector import compute_cosine_similarity 
+from intelligence .local_drift import scorer_from_env 
+
+
+drift_scorer =scorer_from_env ()
+
+
+def calculate_drift_embeddings (api_key :str ,topic_text :str ,argument_text :str )->tuple :
+    """
+    Calculate semantic drift and keep the vectors it was computed from
+
+    Returns:
+        (drift score, topic embedding, argument embedding)
+    """
+    topic_embedding ,argument_embedding =generate_embeddings (
+    api_key ,[topic_text ,argument_text ]
+    )
+    return compute_cosine_similarity (topic_embedding ,argument_embedding ),topic_embedding ,argument_embedding 
 
 
 def calculate_drift_score (api_key :str ,topic_text :str ,argument_text :str )->float :
     """
     Calculate semantic drift between topic and argument
-    Uses caching for topic embeddings
-    
+    Uses caching for topic embeddings; misses are embedded in one batched call
+
     Args:
         api_key: Gemini API key
         topic_text: Debate topic
         argument_text: User's argument
-    
+
     Returns:
         Float 0-1 (1=perfect alignment, 0=off-topic)
     """
+    return calculate_drift_embeddings (api_key ,topic_text ,argument_text )[0 ]
 
-    topic_embedding =generate_embedding (api_key ,topic_text )
-    argument_embedding =generate_embedding (api_key ,argument_text )
 
+def score_drift (topic_text :str ,argument_text :str ,remote ,require_embedding :bool =False )->tuple :
+    """
+    Drift score for a turn, settled locally when clear-cut
+
+    Args:
+        topic_text: Debate topic
+        argument_text: User's argument
+        remote: Zero-argument callable running calculate_drift_score on an analysis key
+        require_embedding: Escalate regardless of mode (the caller needs the vectors)
+
+    Returns:
+        (drift score, source) where source is local, embedding or local_fallback
+    """
+    return drift_scorer .score (topic_text ,argument_text ,remote ,require_embedding )
 
-    drift_score =compute_cosine_similarity (
-    topic_embedding ,
-    argument_embedding 
-    )
 
-    return drift_score 
+def get_drift_stats ()->dict :
+    return drift_scorer .get_stats ()
@@ -0,0 +1,91 @@
+"""
+Embedding Micro-Batcher
+Merges embedding misses from concurrent requests into one embed_content call
+"""
+
+import threading 
+from typing import Callable ,List 
+
+
+class _Batch :
+    def __init__ (self ,api_key :str ):
+        self .api_key =api_key 
+        self .texts =[]
+        self .positions ={}
+        self .full =threading .Event ()
+        self .done =threading .Event ()
+        self .result =None 
+        self .error =None 
+
+    def add (self ,texts :List [str ])->List [int ]:
+        slots =[]
+        for text in texts :
+            if text not in self .positions :
+                self .positions [text ]=len (self .texts )
+                self .texts .append (text )
+            slots .append (self .positions [text ])
+        return slots 
+
+
+class EmbeddingBatcher :
+    """
+    Collects texts from concurrent callers for up to `window` seconds and
+    embeds them with a single upstream call.
+
+    The first caller into an empty batch becomes its leader: it waits out the
+    window (or until max_batch texts are queued), sends the call with its own
+    API key, and hands the vectors (or the error) to every caller in the batch.
+    """
+
+    def __init__ (self ,embed_fn :Callable ,window :float ,max_batch :int =100 ):
+        self .embed_fn =embed_fn 
+        self .window =window 
+        self .max_batch =max_batch 
+        self ._open =None 
+        self ._lock =threading .Lock ()
+
+        self .batches =0 
+        self .merged_texts =0 
+
+    def embed (self ,api_key :str ,texts :List [str ])->list :
+        """Embed texts, sharing the upstream call with concurrent callers"""
+        with self ._lock :
+            batch =self ._open 
+            leader =batch is None or len (batch .texts )+len (texts )>self .max_batch 
+            if leader :
+                if batch is not None :
+                    batch .full .set ()
+                batch =_Batch (api_key )
+                self ._open =batch 
+
+            slots =batch .add (texts )
+            if len (batch .texts )>=self .max_batch :
+                batch .full .set ()
+
+        if leader :
+            batch .full .wait (self .window )
+            with self ._lock :
+                if self ._open is batch :
+                    self ._open =None 
+                self .batches +=1 
+                self .merged_texts +=len (batch .texts )
+
+            try :
+                batch .result =self .embed_fn (batch .api_key ,batch .texts )
+            except Exception as e :
+                batch .error =e 
+            finally :
+                batch .done .set ()
+        else :
+            batch .done .wait ()
+
+        if batch .error is not None :
+            raise batch .error 
+        return [batch .result [i ]for i in slots ]
+
+    def get_stats (self )->dict :
+        return {
+        "window_ms":int (self .window *1000 ),
+        "batches":self .batches ,
+        "texts_per_batch":round (self .merged_texts /self .batches ,2 )if self .batches else 0.0 
+        }
@@ -0,0 +1,188 @@
+"""
+Embedding Store - Persistent Memory-Mapped Vectors
+Shared by every worker process on a host and kept across restarts
+"""
+
+import fcntl 
+import hashlib 
+import json 
+import mmap 
+import os 
+import struct 
+import threading 
+from typing import Dict ,Optional 
+
+import numpy as np 
+
+
+INDEX_RECORD =struct .Struct ("<16sI")
+
+
+def text_digest (cache_key :str )->bytes :
+    """Stable 16-byte hash of a normalized embedding text"""
+    return hashlib .blake2b (cache_key .encode ("utf-8"),digest_size =16 ).digest ()
+
+
+class EmbeddingStore :
+    """
+    Append-only on-disk embedding store.
+
+    Layout of the store directory:
+    - vectors.bin: fixed-width rows of one dtype, appended only
+    - index.bin: (text digest, row) records, appended only after the row is written
+    - meta.json: row width and dtype, written by the first appender
+    - .lock: flock target that serializes appenders across processes
+
+    Readers never lock: they pick up new index records past their last offset
+    and return read-only numpy views over a shared mmap of vectors.bin, so
+    every process on the host reads the same page cache with no copies.
+    Superseded maps are never closed; they are freed once no view uses them.
+    """
+
+    def __init__ (self ,path :str ,dtype :str ):
+        self .path =path 
+        self .dtype =np .dtype (dtype )
+        os .makedirs (path ,exist_ok =True )
+
+        self .vectors_path =os .path .join (path ,"vectors.bin")
+        self .index_path =os .path .join (path ,"index.bin")
+        self .meta_path =os .path .join (path ,"meta.json")
+        self .lock_path =os .path .join (path ,".lock")
+
+        self .dims =None 
+        self ._index :Dict [bytes ,int ]={}
+        self ._index_offset =0 
+        self ._map =None 
+        self ._mapped_rows =0 
+        self ._lock =threading .Lock ()
+
+        self .hits =0 
+        self .misses =0 
+        self .appends =0 
+
+    @property 
+    def row_bytes (self )->int :
+        return self .dims *self .dtype .itemsize 
+
+    def _load_meta (self )->bool :
+        if self .dims is not None :
+            return True 
+        try :
+            with open (self .meta_path )as f :
+                meta =json .load (f )
+        except (OSError ,ValueError ):
+            return False 
+        if np .dtype (meta ["dtype"])!=self .dtype :
+            raise ValueError (f"Embedding store {self .path } holds {meta ['dtype']}, expected {self .dtype }")
+        self .dims =int (meta ["dims"])
+        return True 
+
+    def _refresh_index (self ):
+        """Read index records appended since the last refresh (whole records only)"""
+        try :
+            with open (self .index_path ,"rb")as f :
+                f .seek (self ._index_offset )
+                data =f .read ()
+        except FileNotFoundError :
+            return 
+
+        usable =len (data )-len (data )%INDEX_RECORD .size 
+        for digest ,row in INDEX_RECORD .iter_unpack (data [:usable ]):
+            self ._index [digest ]=row 
+        self ._index_offset +=usable 
+
+    def _view (self ,row :int )->Optional [np .ndarray ]:
+        if row >=self ._mapped_rows :
+            with open (self .vectors_path ,"rb")as f :
+                size =os .fstat (f .fileno ()).st_size 
+                if size <(row +1 )*self .row_bytes :
+                    return None 
+                self ._map =mmap .mmap (f .fileno (),size ,access =mmap .ACCESS_READ )
+                self ._mapped_rows =size //self .row_bytes 
+
+        return np .frombuffer (self ._map ,dtype =self .dtype ,count =self .dims ,offset =row *self .row_bytes )
+
+    def get (self ,cache_key :str )->Optional [np .ndarray ]:
+        """Zero-copy lookup of a stored embedding"""
+        digest =text_digest (cache_key )
+        with self ._lock :
+            row =self ._index .get (digest )
+            if row is None :
+                self ._refresh_index ()
+                row =self ._index .get (digest )
+
+            if row is None or not self ._load_meta ():
+                self .misses +=1 
+                return None 
+
+            vector =self ._view (row )
+            if vector is None :
+                self .misses +=1 
+                return None 
+
+            self .hits +=1 
+            return vector 
+
+    def put (self ,cache_key :str ,vector :np .ndarray ):
+        """Append an embedding unless another process stored it first"""
+        vector =np .ascontiguousarray (vector ,dtype =self .dtype )
+        digest =text_digest (cache_key )
+
+        with self ._lock ,open (self .lock_path ,"a")as lock_file :
+            fcntl .flock (lock_file ,fcntl .LOCK_EX )
+            try :
+                self ._refresh_index ()
+                if digest in self ._index :
+                    return 
+
+                if not self ._load_meta ():
+                    self .dims =int (vector .size )
+                    tmp_path =self .meta_path +".tmp"
+                    with open (tmp_path ,"w")as f :
+                        json .dump ({"dims":self .dims ,"dtype":self .dtype .name },f )
+                    os .replace (tmp_path ,self .meta_path )
+
+                if vector .size !=self .dims :
+                    print (f"⚠️  Embedding store expects {self .dims } dims, got {vector .size }; not stored")
+                    return 
+
+                with open (self .vectors_path ,"ab")as f :
+                    row =f .tell ()//self .row_bytes 
+                    if f .tell ()%self .row_bytes :
+                        f .truncate (row *self .row_bytes )
+                    f .write (vector .tobytes ())
+                    f .flush ()
+
+                with open (self .index_path ,"ab")as f :
+                    f .write (INDEX_RECORD .pack (digest ,row ))
+                    f .flush ()
+
+                self ._index [digest ]=row 
+                self ._index_offset +=INDEX_RECORD .size 
+                self .appends +=1 
+            finally :
+                fcntl .flock (lock_file ,fcntl .LOCK_UN )
+
+    def get_stats (self )->dict :
+        with self ._lock :
+            return {
+            "path":self .path ,
+            "rows":len (self ._index ),
+            "dims":self .dims ,
+            "dtype":self .dtype .name ,
+            "hits":self .hits ,
+            "misses":self .misses ,
+            "appends":self .appends 
+            }
+
+
+def store_from_env (storage :str ,dimensions :Optional [int ])->Optional [EmbeddingStore ]:
+    """
+    Open the store under EMBEDDING_STORE_PATH, or None when it isn't configured.
+    Each storage mode / dimensionality gets its own subdirectory.
+    """
+    root =os .getenv ("EMBEDDING_STORE_PATH")
+    if not root :
+        return None 
+    name =f"gemini-embedding-001-{dimensions or 'full'}-{storage }"
+    return EmbeddingStore (os .path .join (root ,name ),storage )
@@ -0,0 +1,146 @@
+"""
+Judge State - Rolling Debate Digest for the AI Judge
+Keeps summary input bounded however long a debate runs
+"""
+
+import os 
+from typing import Dict ,List ,Optional 
+
+from rate_limiter import estimate_tokens 
+
+
+JUDGE_RECENT_TURNS =int (os .getenv ("JUDGE_RECENT_TURNS",3 ))
+JUDGE_DIGEST_TOKENS =int (os .getenv ("JUDGE_DIGEST_TOKENS",800 ))
+JUDGE_TURN_CHARS =int (os .getenv ("JUDGE_TURN_CHARS",1500 ))
+
+METRIC_KEYS =("logical_coherence","vocabulary_level","aggression_level","fallacy_count")
+
+
+def _excerpt (text :str ,words :int )->str :
+    parts =text .split ()
+    return " ".join (parts [:words ])+(" ..."if len (parts )>words else "")
+
+
+def _clip (text :str )->str :
+    return text if len (text )<=JUDGE_TURN_CHARS else text [:JUDGE_TURN_CHARS ]+" ..."
+
+
+class JudgeState :
+    """
+    Per-session judge input, updated as each turn is stored.
+
+    - aggregates: running sums of the turn metrics and drift
+    - recent: the last JUDGE_RECENT_TURNS turns verbatim (clipped)
+    - digest: older turns as one-line excerpts with their metrics; when the
+      digest exceeds JUDGE_DIGEST_TOKENS the oldest entries are merged into
+      metric-only ranges, so its size stays bounded
+
+    Each update is O(1) amortized and the summary prompt built from it has a
+    fixed upper size.
+    """
+
+    def __init__ (self ,doc :Optional [Dict ]=None ):
+        doc =doc or {}
+        self .turns =doc .get ("turns",0 )
+        self .sums =dict (doc .get ("sums")or {key :0 for key in METRIC_KEYS +("drift_score","turn_score")})
+        self .difficulty_level =doc .get ("difficulty_level",3 )
+        self .recent :List [Dict ]=list (doc .get ("recent")or [])
+        self .digest :List [Dict ]=list (doc .get ("digest")or [])
+
+    def to_doc (self )->Dict :
+        return {
+        "turns":self .turns ,
+        "sums":self .sums ,
+        "difficulty_level":self .difficulty_level ,
+        "recent":self .recent ,
+        "digest":self .digest 
+        }
+
+    @classmethod 
+    def from_debates (cls ,debates :List [Dict ])->"JudgeState":
+        """Build the state from stored debate turns (oldest first)"""
+        state =cls ()
+        for debate in debates :
+            state .update (
+            debate .get ("user_argument",""),
+            debate .get ("ai_response",""),
+            debate .get ("metrics",{}),
+            debate .get ("drift_score",0 ),
+            debate .get ("difficulty_level",3 ),
+            debate .get ("turn_score",0 )
+            )
+        return state 
+
+    def update (self ,argument :str ,ai_response :str ,metrics :Dict ,drift_score :float ,
+    difficulty_level :int ,turn_score :int =0 ):
+        """Fold one stored turn into the state"""
+        self .turns +=1 
+        for key in METRIC_KEYS :
+            self .sums [key ]+=metrics .get (key ,0 )
+        self .sums ["drift_score"]+=drift_score 
+        self .sums ["turn_score"]+=turn_score 
+        self .difficulty_level =difficulty_level 
+
+        self .recent .append ({
+        "turn":self .turns ,
+        "user":_clip (argument ),
+        "ai":_clip (ai_response ),
+        "metrics":{key :metrics .get (key ,0 )for key in METRIC_KEYS },
+        "drift_score":round (drift_score ,3 )
+        })
+
+        while len (self .recent )>JUDGE_RECENT_TURNS :
+            self ._push_digest (self .recent .pop (0 ))
+
+    def _push_digest (self ,turn :Dict ):
+        self .digest .append ({
+        "first":turn ["turn"],
+        "last":turn ["turn"],
+        "count":1 ,
+        "sums":dict (turn ["metrics"],drift_score =turn ["drift_score"]),
+        "excerpt":f"User: {_excerpt (turn ['user'],30 )} | AI: {_excerpt (turn ['ai'],15 )}"
+        })
+
+        while len (self .digest )>1 and estimate_tokens (self .digest_text ())>JUDGE_DIGEST_TOKENS :
+            older ,newer =self .digest [0 ],self .digest [1 ]
+            self .digest [0 :2 ]=[{
+            "first":older ["first"],
+            "last":newer ["last"],
+            "count":older ["count"]+newer ["count"],
+            "sums":{key :older ["sums"][key ]+newer ["sums"][key ]for key in older ["sums"]},
+            "excerpt":None 
+            }]
+
+    def averages (self )->Dict :
+        n =self .turns or 1 
+        return {
+        "avg_coherence":self .sums ["logical_coherence"]/n if self .turns else 0 ,
+        "avg_vocab":self .sums ["vocabulary_level"]/n if self .turns else 0 ,
+        "avg_aggression":self .sums ["aggression_level"]/n if self .turns else 0 ,
+        "total_fallacies":self .sums ["fallacy_count"],
+        "avg_drift":self .sums ["drift_score"]/n if self .turns else 0 ,
+        "avg_turn_score":self .sums ["turn_score"]/n if self .turns else 0 
+        }
+
+    def digest_text (self )->str :
+        lines =[]
+        for entry in self .digest :
+            n =entry ["count"]
+            sums =entry ["sums"]
+            label =f"Turn {entry ['first']}"if n ==1 else f"Turns {entry ['first']}-{entry ['last']}"
+            stats =(
+            f"coherence {sums ['logical_coherence']/n :.1f}, vocabulary {sums ['vocabulary_level']/n :.1f}, "
+            f"aggression {sums ['aggression_level']/n :.1f}, fallacies {sums ['fallacy_count']}, "
+            f"relevance {sums ['drift_score']/n :.2f}"
+            )
+            lines .append (f"{label }: {entry ['excerpt']} ({stats })"if entry ["excerpt"]else f"{label } (avg): {stats }")
+        return "\n".join (lines )
+
+    def recent_text (self )->str :
+        lines =[]
+        for turn in self .recent :
+            lines .append (f"Turn {turn ['turn']}:")
+            lines .append (f"User: {turn ['user']}")
+            lines .append (f"AI: {turn ['ai']}")
+            lines .append ("")
+        return "\n".join (lines )
@@ -0,0 +1,239 @@
+"""
+Local Drift Scorer - Hashed Lexical Similarity
+Scores topic/argument relevance on CPU with no network calls
+"""
+
+import math 
+import os 
+import random 
+import re 
+import threading 
+import zlib 
+from collections import Counter 
+from typing import Callable ,Dict ,Tuple 
+
+from intelligence .drift_policy import DRIFT_THRESHOLDS ,interpret_drift_score 
+
+
+HASH_BUCKETS =1 <<18 
+
+STOPWORDS =frozenset ("""
+a about above after again against all am an and any are as at be because been before being
+below between both but by can could did do does doing down during each few for from further
+had has have having he her here hers herself him himself his how i if in into is it its itself
+just me more most my myself no nor not now of off on once only or other our ours ourselves out
+over own same she should so some such than that the their theirs them themselves then there
+these they this those through to too under until up very was we were what when where which
+while who whom why will with would you your yours yourself yourselves also think believe really
+many much make makes made like get gets one ones people thing things way well even still
+""".split ())
+
+WORD_PATTERN =re .compile (r"[a-z0-9']+")
+
+
+def _features (text :str )->Dict [int ,float ]:
+    """
+    Hashed sparse feature vector: content words, 5-char prefixes (a cheap
+    stem) and character trigrams, weighted by sublinear term frequency
+    """
+    counts =Counter ()
+    for word in WORD_PATTERN .findall (text .lower ()):
+        word =word .strip ("'")
+        if len (word )<3 or word in STOPWORDS :
+            continue 
+        counts ["w:"+word ]+=1.0 
+        if len (word )>5 :
+            counts ["p:"+word [:5 ]]+=1.0 
+        padded =f" {word } "
+        for i in range (len (padded )-2 ):
+            counts ["c:"+padded [i :i +3 ]]+=0.25 
+
+    features ={}
+    for feature ,count in counts .items ():
+        bucket =zlib .crc32 (feature .encode ("utf-8"))%HASH_BUCKETS 
+        weight =1.0 +math .log (count )if count >=1 else count 
+        features [bucket ]=features .get (bucket ,0.0 )+weight 
+    return features 
+
+
+def local_similarity (topic_text :str ,argument_text :str )->float :
+    """Raw lexical cosine similarity between topic and argument (0-1)"""
+    topic =_features (topic_text )
+    argument =_features (argument_text )
+    if not topic or not argument :
+        return 0.0 
+
+    if len (topic )>len (argument ):
+        topic ,argument =argument ,topic 
+    dot =sum (weight *argument .get (bucket ,0.0 )for bucket ,weight in topic .items ())
+    norm =math .sqrt (sum (w *w for w in topic .values ()))*math .sqrt (sum (w *w for w in argument .values ()))
+    return dot /norm if norm else 0.0 
+
+
+LOCAL_DRIFT_OFFSET =float (os .getenv ("LOCAL_DRIFT_OFFSET",0.25 ))
+LOCAL_DRIFT_SCALE =float (os .getenv ("LOCAL_DRIFT_SCALE",1.2 ))
+
+
+def calibrate (similarity :float )->float :
+    """
+    Map raw lexical similarity onto the embedding drift score scale.
+    No overlap maps below the DRIFTING threshold, so local-only and
+    fallback scores can still report OFF_TOPIC.
+    """
+    return max (0.0 ,min (1.0 ,LOCAL_DRIFT_OFFSET +LOCAL_DRIFT_SCALE *similarity ))
+
+
+def local_drift_score (topic_text :str ,argument_text :str )->float :
+    """
+    Calculate drift score without any API call
+
+    Returns:
+        Float 0-1 on the same scale as calculate_drift_score
+    """
+    return calibrate (local_similarity (topic_text ,argument_text ))
+
+
+class TieredDriftScorer :
+    """
+    Scores drift locally and escalates to the embedding path only when needed.
+
+    Modes:
+    - embedding: always use embeddings; the local score is computed alongside
+      so agreement can be measured before switching modes
+    - tiered: settle scores that are clearly ON_TOPIC (above its threshold
+      by more than `band`), escalate the rest
+    - local: never call the API
+
+    Lexical overlap is one-sided evidence: a paraphrase can share no words
+    with the topic, so in tiered mode a low local score is escalated rather
+    than settled as off-topic.
+
+    In every mode a failed embedding call (rate limit or upstream error)
+    falls back to the local score.
+    A fraction `audit_rate` of settled turns is escalated anyway to measure
+    how often settling was right.
+    """
+
+    def __init__ (self ,mode :str ,band :float ,audit_rate :float ):
+        if mode not in ("embedding","tiered","local"):
+            raise ValueError (f"Unknown drift scorer mode: {mode }")
+        self .mode =mode 
+        self .band =band 
+        self .audit_rate =audit_rate 
+        self ._lock =threading .Lock ()
+
+        self .turns =0 
+        self .settled =0 
+        self .escalated =0 
+        self .required =0 
+        self .fallbacks =0 
+        self .audited =0 
+        self .audit_agreed =0 
+        self .compared =0 
+        self .agreed =0 
+        self .abs_error =0.0 
+
+        self ._fit =[0.0 ,0.0 ,0.0 ,0.0 ]
+
+    def is_settled (self ,score :float )->bool :
+        """Only confident on-topic scores are settled without embeddings"""
+        return score >=DRIFT_THRESHOLDS [0 ]+self .band 
+
+    def score (self ,topic_text :str ,argument_text :str ,remote :Callable [[],float ],require_embedding :bool =False )->Tuple [float ,str ]:
+        """
+        Args:
+            topic_text: Debate topic
+            argument_text: User's argument
+            remote: Embedding-based scorer, called only on escalation
+            require_embedding: Escalate regardless of mode; counted apart from
+                ambiguity escalations
+
+        Returns:
+            (drift score, source) where source is local, embedding or local_fallback
+        """
+        similarity =local_similarity (topic_text ,argument_text )
+        local_score =calibrate (similarity )
+
+        audit =False 
+        with self ._lock :
+            self .turns +=1 
+            if require_embedding :
+                self .required +=1 
+            elif self .mode =="local":
+                self .settled +=1 
+                return local_score ,"local"
+            elif self .mode =="tiered"and self .is_settled (local_score ):
+                audit =random .random ()<self .audit_rate 
+                if not audit :
+                    self .settled +=1 
+                    return local_score ,"local"
+                self .escalated +=1 
+            else :
+                self .escalated +=1 
+
+        try :
+            remote_score =remote ()
+        except Exception as e :
+            print (f"⚠️  Drift embeddings failed ({e }); using local score")
+            with self ._lock :
+                self .fallbacks +=1 
+            return local_score ,"local_fallback"
+
+        self ._compare (similarity ,local_score ,remote_score ,audit )
+        return remote_score ,"embedding"
+
+    def _compare (self ,similarity :float ,local_score :float ,remote_score :float ,audit :bool ):
+        agree =interpret_drift_score (local_score )["status"]==interpret_drift_score (remote_score )["status"]
+        with self ._lock :
+            self .compared +=1 
+            self .agreed +=agree 
+            self .abs_error +=abs (local_score -remote_score )
+            if audit :
+                self .audited +=1 
+                self .audit_agreed +=agree 
+
+            fit =self ._fit 
+            fit [0 ]+=similarity 
+            fit [1 ]+=remote_score 
+            fit [2 ]+=similarity *similarity 
+            fit [3 ]+=similarity *remote_score 
+
+    def _suggested_calibration (self )->dict :
+        n =self .compared 
+        sx ,sy ,sxx ,sxy =self ._fit 
+        variance =n *sxx -sx *sx 
+        if n <20 or variance <=1e-9 :
+            return {}
+        scale =(n *sxy -sx *sy )/variance 
+        return {
+        "offset":round ((sy -scale *sx )/n ,3 ),
+        "scale":round (scale ,3 )
+        }
+
+    def get_stats (self )->dict :
+        with self ._lock :
+            return {
+            "mode":self .mode ,
+            "band":self .band ,
+            "calibration":{"offset":LOCAL_DRIFT_OFFSET ,"scale":LOCAL_DRIFT_SCALE },
+            "suggested_calibration":self ._suggested_calibration (),
+            "turns":self .turns ,
+            "settled_locally":self .settled ,
+            "escalated":self .escalated ,
+            "embedding_required":self .required ,
+            "escalation_rate":round (self .escalated /(self .turns -self .required ),3 )if self .turns >self .required else 0.0 ,
+            "fallbacks":self .fallbacks ,
+            "compared":self .compared ,
+            "status_agreement":round (self .agreed /self .compared ,3 )if self .compared else None ,
+            "mean_abs_error":round (self .abs_error /self .compared ,3 )if self .compared else None ,
+            "audited":self .audited ,
+            "audit_agreement":round (self .audit_agreed /self .audited ,3 )if self .audited else None 
+            }
+
+
+def scorer_from_env ()->TieredDriftScorer :
+    return TieredDriftScorer (
+    mode =os .getenv ("DRIFT_SCORER","tiered").lower (),
+    band =float (os .getenv ("LOCAL_DRIFT_BAND",0.1 )),
+    audit_rate =float (os .getenv ("LOCAL_DRIFT_AUDIT_RATE",0.05 ))
+    )
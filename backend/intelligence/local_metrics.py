@@ -0,0 +1,183 @@
+"""
+Local Argument Metrics - Deterministic Heuristic Analyzer
+Estimates argument metrics on CPU in microseconds, with no API calls
+"""
+
+import math 
+import re 
+from typing import Dict ,List 
+
+
+WORD_PATTERN =re .compile (r"[A-Za-z][A-Za-z'-]*")
+SENTENCE_PATTERN =re .compile (r"[.!?]+")
+VOWEL_GROUP_PATTERN =re .compile (r"[aeiouy]+")
+EVIDENCE_PATTERN =re .compile (
+r"\b\d+(?:\.\d+)?\s*%|\b\d{2,}\b|\b(?:study|studies|research|data|evidence|survey|statistics|report|according to)\b",
+re .IGNORECASE 
+)
+
+CONNECTIVES ={
+"cause":r"because|since|due to|as a result|therefore|thus|hence|consequently|so that|leads to|which means",
+"contrast":r"however|although|though|whereas|on the other hand|nevertheless|but|yet|despite|instead",
+"example":r"for example|for instance|such as|e\.g\.|specifically|in particular|consider",
+"sequence":r"first|firstly|second|secondly|finally|furthermore|moreover|additionally|in addition|also",
+"conclusion":r"in conclusion|overall|ultimately|in short|this shows|clearly",
+}
+
+HOSTILE_WORDS =frozenset ("""
+idiot idiots idiotic stupid stupidity dumb moron morons moronic fool fools foolish ignorant
+pathetic ridiculous absurd nonsense garbage trash rubbish clown clowns liar liars lying
+delusional brainless clueless incompetent disgusting shameful hate hateful loser losers
+crap bullshit shit damn hell sucks useless worthless laughable insane crazy joke
+""".split ())
+
+HOSTILE_PHRASES =re .compile (
+r"\b(?:shut up|get lost|grow up|wake up|give me a break|are you serious|how dare you|no one cares|nobody cares)\b",
+re .IGNORECASE 
+)
+
+FALLACIES ={
+"ad_hominem":(
+r"\byou(?:'re| are)\s+(?:just\s+|so\s+|too\s+|an?\s+)*(?:idiot|stupid|dumb|ignorant|biased|clueless|liar|fool|moron|naive)"
+r"|\bpeople like you\b|\bwhat (?:would|do) you know\b"
+),
+"slippery_slope":(
+r"\bslippery slope\b|\bnext thing (?:you know|we know)\b|\bwhere does it (?:end|stop)\b"
+r"|\bwill (?:inevitably|eventually) lead to\b|\bbefore (?:you|we) know it\b"
+),
+"bandwagon":(
+r"\b(?:everyone|everybody) (?:knows|agrees|thinks|believes)\b|\bmost people (?:agree|think|believe)\b"
+r"|\bit'?s common (?:sense|knowledge)\b"
+),
+"false_dilemma":(
+r"\beither\b[^.!?]{1,80}\bor else\b|\bthe only (?:option|choice|alternative|way)\b|\bthere are only two\b"
+r"|\byou(?:'re| are) either\b"
+),
+"hasty_generalization":(
+r"\b(?:all|every) \w+s? (?:are|is|always|never)\b|\b(?:always|never) (?:works|fails|has|have)\b"
+),
+"appeal_to_authority":(
+r"\b(?:experts|scientists|doctors|they) (?:say|agree|said)\b(?![^.!?]*\b(?:study|report|published|according)\b)"
+),
+"tu_quoque":(
+r"\bwhat about\b|\byou (?:also|too) (?:do|did)\b|\blook who'?s talking\b"
+),
+"straw_man":(
+r"\bso (?:you(?:'re| are)|what you(?:'re| are)) (?:saying|suggesting)\b"
+),
+}
+
+
+CONNECTIVE_PATTERN =re .compile (
+r"\b(?:"+"|".join (f"(?P<{kind }>{words })"for kind ,words in CONNECTIVES .items ())+r")\b",
+re .IGNORECASE 
+)
+FALLACY_PATTERN =re .compile (
+"|".join (f"(?P<{name }>{pattern })"for name ,pattern in FALLACIES .items ()),
+re .IGNORECASE 
+)
+AD_HOMINEM_PATTERN =re .compile (FALLACIES ["ad_hominem"],re .IGNORECASE )
+SILENT_E_PATTERN =re .compile (r"[aeiouy][^aeiouy\s]*[^aeiouyl\s]e\b")
+
+
+def _clamp (value :float ,low :float =0.0 ,high :float =1.0 )->float :
+    return max (low ,min (high ,value ))
+
+
+def _syllables (lowered_text :str )->int :
+    """Vowel groups, minus a trailing silent e in words that have another vowel"""
+    return len (VOWEL_GROUP_PATTERN .findall (lowered_text ))-len (SILENT_E_PATTERN .findall (lowered_text ))
+
+
+def _vocabulary_level (words :List [str ],sentence_count :int )->int :
+    """Lexical diversity, word length and Flesch-Kincaid grade, blended onto 1-10"""
+    lowered =[w .lower ()for w in words ]
+    n =len (words )
+
+    root_ttr =len (set (lowered ))/math .sqrt (n )
+    avg_length =sum (len (w )for w in words )/n 
+    long_ratio =sum (1 for w in words if len (w )>=7 )/n 
+    syllables =max (n ,_syllables (" ".join (lowered )))
+    grade =0.39 *(n /sentence_count )+11.8 *(syllables /n )-15.59 
+
+    blend =(
+    _clamp ((root_ttr -2.0 )/6.0 )+
+    _clamp ((avg_length -3.5 )/3.0 )+
+    _clamp (long_ratio /0.4 )+
+    _clamp ((grade -4.0 )/12.0 )
+    )/4 
+
+    blend *=_clamp (n /15.0 ,0.4 ,1.0 )
+    return int (round (1 +9 *blend ))
+
+
+def _aggression_level (text :str ,words :List [str ])->int :
+    """Hostile lexicon, shouting (caps, exclamation marks) and direct insults"""
+    hostile =sum (1 for w in words if w .lower ()in HOSTILE_WORDS )
+    hostile +=len (HOSTILE_PHRASES .findall (text ))
+    caps =sum (1 for w in words if len (w )>=3 and w .isupper ())
+    exclamations =text .count ("!")
+
+    score =(
+    1 +
+    2.0 *min (hostile ,3 )+
+    6.0 *_clamp (caps /len (words )*4 )+
+    min (2.0 ,0.5 *exclamations )
+    )
+    if AD_HOMINEM_PATTERN .search (text ):
+        score +=2 
+    return int (round (_clamp (score ,1 ,10 )))
+
+
+def _fallacies (text :str )->List [str ]:
+    return sorted ({match .lastgroup for match in FALLACY_PATTERN .finditer (text )})
+
+
+def _logical_coherence (text :str ,words :List [str ],sentence_count :int ,fallacy_count :int ,aggression :int )->int :
+    """Discourse connectives, argument development and evidence, minus fallacies"""
+    kinds =[match .lastgroup for match in CONNECTIVE_PATTERN .finditer (text )]
+    connective_kinds =len (set (kinds ))
+    connective_density =len (kinds )/sentence_count 
+
+    score =(
+    2.5 +
+    3.0 *_clamp (connective_kinds /3.0 )+
+    1.0 *_clamp (connective_density /1.5 )+
+    2.0 *_clamp ((len (words )-8 )/60.0 )+
+    1.5 *(1.0 if EVIDENCE_PATTERN .search (text )else 0.0 )-
+    1.0 *fallacy_count -
+    (1.0 if aggression >=6 else 0.0 )
+    )
+    return int (round (_clamp (score ,1 ,10 )))
+
+
+def compute_local_metrics (argument_text :str )->Dict [str ,int ]:
+    """
+    Estimate argument metrics without calling the API
+
+    Args:
+        argument_text: User's argument
+
+    Returns:
+        Dict with logical_coherence, vocabulary_level, aggression_level (1-10)
+        and fallacy_count, same shape as analyze_argument
+    """
+    words =WORD_PATTERN .findall (argument_text )
+    if not words :
+        return {
+        "logical_coherence":1 ,
+        "vocabulary_level":1 ,
+        "aggression_level":1 ,
+        "fallacy_count":0 
+        }
+
+    sentence_count =max (1 ,len ([s for s in SENTENCE_PATTERN .split (argument_text )if s .strip ()]))
+    fallacy_count =len (_fallacies (argument_text ))
+    aggression =_aggression_level (argument_text ,words )
+
+    return {
+    "logical_coherence":_logical_coherence (argument_text ,words ,sentence_count ,fallacy_count ,aggression ),
+    "vocabulary_level":_vocabulary_level (words ,sentence_count ),
+    "aggression_level":aggression ,
+    "fallacy_count":fallacy_count 
+    }
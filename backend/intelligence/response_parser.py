@@ -0,0 +1,274 @@
+"""
+Response Parser - Combined Counter-Argument + Analysis Format
+Parses the COUNTER_ARGUMENT / ANALYSIS layout incrementally as chunks arrive
+"""
+
+import json 
+import re 
+from typing import Optional ,Tuple 
+
+
+COUNTER_MARKER ="COUNTER_ARGUMENT:"
+ANALYSIS_MARKER ="ANALYSIS:"
+
+DEFAULT_METRICS ={
+"logical_coherence":5 ,
+"vocabulary_level":5 ,
+"aggression_level":5 ,
+"fallacy_count":0 
+}
+
+METRIC_PATTERN =re .compile (
+r'"?(logical_coherence|vocabulary_level|aggression_level|fallacy_count)"?\s*:\s*"?(-?\d+(?:\.\d+)?)'
+)
+
+
+def _extract_json_object (text :str )->Optional [str ]:
+    """First balanced {...} in text (string-aware), or None if not closed yet"""
+    start =text .find ("{")
+    if start ==-1 :
+        return None 
+
+    depth =0 
+    in_string =False 
+    escaped =False 
+    for i in range (start ,len (text )):
+        char =text [i ]
+        if in_string :
+            if escaped :
+                escaped =False 
+            elif char =="\\":
+                escaped =True 
+            elif char =='"':
+                in_string =False 
+        elif char =='"':
+            in_string =True 
+        elif char =="{":
+            depth +=1 
+        elif char =="}":
+            depth -=1 
+            if depth ==0 :
+                return text [start :i +1 ]
+    return None 
+
+
+class CombinedResponseParser :
+    """
+    Incremental parser for analyze_with_response output.
+
+    feed() returns only counter-argument text that is safe to show: the
+    leading COUNTER_ARGUMENT: label, surrounding whitespace and anything that
+    could be the start of the ANALYSIS: marker are held back. After the
+    marker, the metrics JSON is parsed as soon as its closing brace arrives.
+    """
+
+    def __init__ (self ):
+        self ._pending =""
+        self ._started =False 
+        self ._analysis =""
+        self ._analysis_closed =False 
+        self .counter_argument =""
+        self .in_analysis =False 
+        self .metrics =None 
+
+    @property 
+    def analysis_text (self )->str :
+        return self ._analysis 
+
+    def _holdback (self )->int :
+        """Length of the pending tail that might still turn into the marker"""
+        for size in range (min (len (ANALYSIS_MARKER )-1 ,len (self ._pending )),0 ,-1 ):
+            if ANALYSIS_MARKER .startswith (self ._pending [-size :]):
+                return size 
+        return 0 
+
+    def feed (self ,chunk :str )->str :
+        """
+        Args:
+            chunk: Next piece of model output
+
+        Returns:
+            Newly displayable counter-argument text (may be empty)
+        """
+        if self .in_analysis :
+            self ._feed_analysis (chunk )
+            return ""
+
+        self ._pending +=chunk 
+        if not self ._started :
+            stripped =self ._pending .lstrip ()
+            if len (stripped )<len (COUNTER_MARKER )and COUNTER_MARKER .startswith (stripped ):
+                return ""
+            if stripped .startswith (COUNTER_MARKER ):
+                stripped =stripped [len (COUNTER_MARKER ):].lstrip ()
+            self ._pending =stripped 
+            self ._started =bool (stripped )
+
+        marker =self ._pending .find (ANALYSIS_MARKER )
+        if marker !=-1 :
+            text =self ._pending [:marker ].rstrip ()
+            rest =self ._pending [marker +len (ANALYSIS_MARKER ):]
+            self ._pending =""
+            self .in_analysis =True 
+            self ._feed_analysis (rest )
+        else :
+            safe =len (self ._pending )-self ._holdback ()
+            text =self ._pending [:safe ].rstrip ()
+            self ._pending =self ._pending [len (text ):]
+
+        self .counter_argument +=text 
+        return text 
+
+    def _feed_analysis (self ,chunk :str ):
+        if self ._analysis_closed :
+            return 
+        self ._analysis +=chunk 
+        candidate =_extract_json_object (self ._analysis )
+        if candidate is not None :
+            self ._analysis_closed =True 
+            try :
+                self .metrics =json .loads (candidate )
+            except ValueError as e :
+                print (f"⚠️  Analysis JSON invalid: {e }")
+
+    def finish (self )->Tuple [str ,str ]:
+        """
+        Flush held-back text at the end of the stream
+
+        Returns:
+            (remaining displayable text, full counter-argument)
+        """
+        text =""
+        if not self .in_analysis :
+            text =self ._pending .strip ()
+            if not self ._started and text .startswith (COUNTER_MARKER ):
+                text =text [len (COUNTER_MARKER ):].strip ()
+            self ._pending =""
+            self .counter_argument +=text 
+        return text ,self .counter_argument 
+
+
+def parse_combined_response (response_text :str )->dict :
+    """
+    Parse a complete combined response
+
+    Returns:
+        Dict with ai_response and metrics
+
+    Raises:
+        ValueError: if the ANALYSIS section or its JSON is missing
+    """
+    parser =CombinedResponseParser ()
+    parser .feed (response_text )
+    _ ,counter_argument =parser .finish ()
+
+    if not parser .in_analysis :
+        raise ValueError ("Response format incorrect")
+    if parser .metrics is None :
+        raise ValueError ("Analysis JSON incomplete")
+
+    return {
+    "ai_response":counter_argument ,
+    "metrics":normalize_metrics (parser .metrics )
+    }
+
+
+def normalize_metrics (raw :dict ,defaults :Optional [dict ]=None )->dict :
+    """Clamp metric values into range and fill missing keys from defaults"""
+    metrics =dict (defaults or DEFAULT_METRICS )
+    for key in DEFAULT_METRICS :
+        try :
+            value =int (float (raw [key ]))
+        except (KeyError ,TypeError ,ValueError ):
+            continue 
+        metrics [key ]=max (0 ,value )if key =="fallacy_count"else max (1 ,min (10 ,value ))
+    return metrics 
+
+
+def salvage_metrics (text :str ,defaults :Optional [dict ]=None )->Optional [dict ]:
+    """
+    Pull whatever metric values appear in (possibly broken or truncated) text
+
+    Returns:
+        Normalized metrics, or None if no metric value is present at all
+    """
+    found ={key :value for key ,value in METRIC_PATTERN .findall (text )}
+    return normalize_metrics (found ,defaults )if found else None 
+
+
+def salvage_string_field (text :str ,field :str )->Optional [str ]:
+    """Value of a JSON string field, even if the string was cut off mid-way"""
+    match =re .search (r'"%s"\s*:\s*"'%re .escape (field ),text )
+    if not match :
+        return None 
+
+    chars =[]
+    i =match .end ()
+    while i <len (text ):
+        char =text [i ]
+        if char =='"':
+            break 
+        if char =="\\":
+            escape =text [i :i +6 ]if text [i +1 :i +2 ]=="u"else text [i :i +2 ]
+            try :
+                chars .append (json .loads (f'"{escape }"'))
+            except ValueError :
+                break 
+            i +=len (escape )
+            continue 
+        chars .append (char )
+        i +=1 
+    return "".join (chars ).strip ()
+
+
+def salvage_combined_response (response_text :str ,defaults :Optional [dict ]=None )->Optional [dict ]:
+    """
+    Tolerant variant of parse_combined_response: keeps the counter-argument
+    and any readable metrics, defaulting the rest
+
+    Returns:
+        Dict with ai_response and metrics, or None if there is no counter-argument
+    """
+    parser =CombinedResponseParser ()
+    parser .feed (response_text )
+    _ ,counter_argument =parser .finish ()
+    if not counter_argument :
+        return None 
+
+    metrics =parser .metrics 
+    if metrics is None :
+        metrics =salvage_metrics (parser .analysis_text ,defaults )or dict (defaults or DEFAULT_METRICS )
+
+    return {
+    "ai_response":counter_argument ,
+    "metrics":normalize_metrics (metrics ,defaults )
+    }
+
+
+def parse_structured_response (response_text :str ,defaults :Optional [dict ]=None )->Tuple [Optional [dict ],bool ]:
+    """
+    Parse schema-constrained JSON output ({"ai_response": ..., "metrics": {...}})
+
+    Returns:
+        (result, salvaged): result is None if no counter-argument could be
+        recovered; salvaged is True when the JSON had to be repaired
+    """
+    try :
+        data =json .loads (response_text )
+        ai_response =str (data ["ai_response"]).strip ()
+        if ai_response :
+            return {
+            "ai_response":ai_response ,
+            "metrics":normalize_metrics (data .get ("metrics")or {},defaults )
+            },False 
+    except (ValueError ,KeyError ,TypeError ,AttributeError ):
+        pass 
+
+    ai_response =salvage_string_field (response_text ,"ai_response")
+    if not ai_response :
+        return None ,True 
+
+    return {
+    "ai_response":ai_response ,
+    "metrics":salvage_metrics (response_text ,defaults )or dict (defaults or DEFAULT_METRICS )
+    },True 
@@ -0,0 +1,124 @@
+"""
+Session Drift Tracker - Rolling Centroid
+Tracks drift across a whole debate session in O(dim) per turn
+"""
+
+from typing import Optional 
+
+import numpy as np 
+
+from intelligence .drift_detector import cosine_one_to_one 
+
+
+def _unit (vec )->np .ndarray :
+    vector =np .asarray (vec ,dtype =np .float32 )
+    norm =float (np .linalg .norm (vector ))
+    return vector /norm if norm else vector 
+
+
+def _decode (data )->Optional [np .ndarray ]:
+    if data is None :
+        return None 
+    return np .frombuffer (bytes (data ),dtype =np .float32 ).copy ()
+
+
+class SessionDrift :
+    """
+    Running state of a debate session's drift.
+
+    Keeps the mean of the unit-normalized turn embeddings (the session
+    centroid) and the last turn's embedding, so each turn is folded in with
+    O(dim) work and nothing is recomputed from earlier turns. Turns scored
+    without embeddings (local drift, rate-limited key) still update the
+    running mean drift score.
+    """
+
+    def __init__ (self ,centroid =None ,last_embedding =None ,embedded_turns =0 ,turns =0 ,
+    mean_drift_score =0.0 ,topic_drift =None ,turn_to_turn_drift =None ):
+        self .centroid =centroid 
+        self .last_embedding =last_embedding 
+        self .embedded_turns =embedded_turns 
+        self .turns =turns 
+        self .mean_drift_score =mean_drift_score 
+        self .topic_drift =topic_drift 
+        self .turn_to_turn_drift =turn_to_turn_drift 
+
+    @classmethod 
+    def from_doc (cls ,doc :Optional [dict ])->"SessionDrift":
+        """Rebuild from the `drift` field of a debate session document"""
+        if not doc :
+            return cls ()
+        return cls (
+        centroid =_decode (doc .get ("centroid")),
+        last_embedding =_decode (doc .get ("last_embedding")),
+        embedded_turns =doc .get ("embedded_turns",0 ),
+        turns =doc .get ("turns",0 ),
+        mean_drift_score =doc .get ("mean_drift_score",0.0 ),
+        topic_drift =doc .get ("topic_drift"),
+        turn_to_turn_drift =doc .get ("turn_to_turn_drift")
+        )
+
+    def to_doc (self )->dict :
+        """Serialize for Mongo; vectors are stored as raw float32 bytes"""
+        return {
+        "dims":int (self .centroid .shape [0 ])if self .centroid is not None else None ,
+        "centroid":self .centroid .tobytes ()if self .centroid is not None else None ,
+        "last_embedding":self .last_embedding .tobytes ()if self .last_embedding is not None else None ,
+        "embedded_turns":self .embedded_turns ,
+        "turns":self .turns ,
+        "mean_drift_score":self .mean_drift_score ,
+        "topic_drift":self .topic_drift ,
+        "turn_to_turn_drift":self .turn_to_turn_drift 
+        }
+
+    def update (self ,drift_score :float ,topic_embedding =None ,argument_embedding =None )->dict :
+        """
+        Fold one turn into the session
+
+        Args:
+            drift_score: The turn's topic drift score
+            topic_embedding: Topic vector, if the turn was embedded
+            argument_embedding: Argument vector, if the turn was embedded
+
+        Returns:
+            Session drift signals (see signals())
+        """
+        self .turns +=1 
+        self .mean_drift_score +=(drift_score -self .mean_drift_score )/self .turns 
+
+        if topic_embedding is None or argument_embedding is None :
+            return self .signals ()
+
+        unit =_unit (argument_embedding )
+        if self .centroid is not None and self .centroid .shape !=unit .shape :
+            self .centroid =None 
+            self .last_embedding =None 
+            self .embedded_turns =0 
+
+        if self .last_embedding is not None :
+            self .turn_to_turn_drift =cosine_one_to_one (unit ,self .last_embedding )
+
+        if self .centroid is None :
+            self .centroid =unit .copy ()
+        else :
+            self .centroid +=(unit -self .centroid )/(self .embedded_turns +1 )
+        self .embedded_turns +=1 
+        self .last_embedding =unit 
+
+        self .topic_drift =cosine_one_to_one (self .centroid ,topic_embedding )
+        return self .signals ()
+
+    def signals (self )->dict :
+        """
+        Returns:
+            topic_drift: centroid of the embedded turns vs the topic (1=aligned)
+            turn_to_turn_drift: latest embedded turn vs the one before it
+            mean_drift_score: running mean of per-turn drift scores
+        """
+        return {
+        "turns":self .turns ,
+        "embedded_turns":self .embedded_turns ,
+        "topic_drift":round (self .topic_drift ,3 )if self .topic_drift is not None else None ,
+        "turn_to_turn_drift":round (self .turn_to_turn_drift ,3 )if self .turn_to_turn_drift is not None else None ,
+        "mean_drift_score":round (self .mean_drift_score ,3 )
+        }
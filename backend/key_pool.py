@@ -0,0 +1,201 @@
+"""
+Key Pool - Health-Weighted Routing with Circuit Breakers
+Spreads one purpose ("debate", "analysis", "judge") across several API keys
+"""
+
+import os 
+import threading 
+import time 
+from typing import List ,Optional 
+
+from rate_limiter import RateLimiter ,RateLimitExceeded 
+
+
+CLOSED ="closed"
+OPEN ="open"
+HALF_OPEN ="half_open"
+
+
+class PooledKey :
+    """
+    One API key in a pool, with its rate limiter bucket, circuit breaker state
+    and smoothed latency / error rate used for routing weights.
+    """
+
+    def __init__ (self ,api_key :str ,name :str ,bucket ):
+        self .api_key =api_key 
+        self .name =name 
+        self .bucket =bucket 
+
+        self .state =CLOSED 
+        self .consecutive_failures =0 
+        self .opened_at =0.0 
+        self .probe_in_flight =False 
+
+        self .latency_ewma =1.0 
+        self .error_ewma =0.0 
+        self .current_weight =0.0 
+
+        self .calls =0 
+        self .failures =0 
+
+    def weight (self )->float :
+        """Routing weight: healthy, fast keys get proportionally more traffic"""
+        return max (0.05 ,1.0 -self .error_ewma )/(0.25 +self .latency_ewma )
+
+    def to_dict (self )->dict :
+        return {
+        "name":self .name ,
+        "state":self .state ,
+        "consecutive_failures":self .consecutive_failures ,
+        "latency_ms":int (self .latency_ewma *1000 ),
+        "error_rate":round (self .error_ewma ,3 ),
+        "weight":round (self .weight (),3 ),
+        "calls":self .calls ,
+        "failures":self .failures ,
+        "rate_limit":self .bucket .get_stats ()
+        }
+
+
+class KeyPool :
+    """
+    Pool of keys serving one purpose.
+
+    Keys are picked with smooth weighted round-robin over the keys whose
+    circuit is closed (or half-open with no probe running). A key that fails
+    with 429/5xx GEMINI_BREAKER_THRESHOLD times in a row is taken out of
+    rotation for GEMINI_BREAKER_COOLDOWN seconds, then gets a single probe call.
+    """
+
+    EWMA_ALPHA =0.2 
+
+    def __init__ (self ,purpose :str ,api_keys :List [str ],rate_limiter :RateLimiter ):
+        self .purpose =purpose 
+        self .failure_threshold =int (os .getenv ("GEMINI_BREAKER_THRESHOLD",3 ))
+        self .cooldown =float (os .getenv ("GEMINI_BREAKER_COOLDOWN",30 ))
+        self .lock =threading .Lock ()
+
+        base_name =f"{purpose .upper ()}_KEY"
+        self .keys =[
+        PooledKey (
+        api_key ,
+        base_name if i ==0 else f"{base_name }#{i +1 }",
+        rate_limiter .bucket (api_key ,purpose )
+        )
+        for i ,api_key in enumerate (api_keys )
+        ]
+
+    def _available (self ,now :float ,exclude )->List [PooledKey ]:
+        available =[]
+        for key in self .keys :
+            if key in exclude :
+                continue 
+            if key .state ==OPEN and now -key .opened_at >=self .cooldown :
+                key .state =HALF_OPEN 
+            if key .state ==CLOSED or (key .state ==HALF_OPEN and not key .probe_in_flight ):
+                available .append (key )
+        return available 
+
+    def _pick (self ,exclude )->Optional [PooledKey ]:
+        with self .lock :
+            available =self ._available (time .monotonic (),exclude )
+            if not available :
+                return None 
+
+            total =0.0 
+            best =None 
+            for key in available :
+                weight =key .weight ()
+                key .current_weight +=weight 
+                total +=weight 
+                if best is None or key .current_weight >best .current_weight :
+                    best =key 
+
+            best .current_weight -=total 
+            if best .state ==HALF_OPEN :
+                best .probe_in_flight =True 
+            return best 
+
+    def _release_probe (self ,key :PooledKey ):
+        with self .lock :
+            key .probe_in_flight =False 
+
+    def acquire (self ,tokens :int =0 ,deadline :Optional [float ]=None ):
+        """
+        Pick a key and reserve rate limiter capacity on it
+
+        Returns:
+            (PooledKey, seconds to wait before calling)
+
+        Raises:
+            RateLimitExceeded: When every key is open or over its queue deadline
+        """
+        tried =set ()
+        retry_after =None 
+
+        while True :
+            key =self ._pick (tried )
+            if key is None :
+                break 
+
+            tried .add (key )
+            try :
+                return key ,key .bucket .reserve (key .name ,tokens ,deadline )
+            except RateLimitExceeded as e :
+                self ._release_probe (key )
+                retry_after =e .retry_after if retry_after is None else min (retry_after ,e .retry_after )
+
+        if retry_after is None :
+            retry_after =self .time_until_probe ()
+        raise RateLimitExceeded (f"{self .purpose .upper ()} pool",retry_after )
+
+    def time_until_probe (self )->float :
+        """Seconds until the first open circuit becomes eligible for a probe"""
+        with self .lock :
+            now =time .monotonic ()
+            waits =[
+            max (0.0 ,self .cooldown -(now -key .opened_at ))
+            for key in self .keys if key .state ==OPEN 
+            ]
+            return min (waits )if waits else self .cooldown 
+
+    def record_success (self ,key :PooledKey ,latency :float ):
+        with self .lock :
+            key .calls +=1 
+            key .latency_ewma +=self .EWMA_ALPHA *(latency -key .latency_ewma )
+            key .error_ewma -=self .EWMA_ALPHA *key .error_ewma 
+            key .consecutive_failures =0 
+            key .probe_in_flight =False 
+            if key .state !=CLOSED :
+                print (f"✅ {key .name } recovered - circuit closed")
+            key .state =CLOSED 
+
+    def record_neutral (self ,key :PooledKey ):
+        """
+        Record a call that failed for reasons unrelated to the key's health
+        (e.g. a 400 on a bad request): the circuit state and health averages
+        are left as they are, a half-open key just becomes probeable again
+        """
+        with self .lock :
+            key .calls +=1 
+            key .probe_in_flight =False 
+
+    def record_failure (self ,key :PooledKey ):
+        """Record a 429/5xx/auth error; opens the circuit once the threshold is reached"""
+        with self .lock :
+            key .calls +=1 
+            key .failures +=1 
+            key .error_ewma +=self .EWMA_ALPHA *(1.0 -key .error_ewma )
+            key .consecutive_failures +=1 
+            key .probe_in_flight =False 
+
+            if key .state ==HALF_OPEN or key .consecutive_failures >=self .failure_threshold :
+                if key .state !=OPEN :
+                    print (f"🔌 {key .name } circuit open for {self .cooldown :.0f}s after {key .consecutive_failures } failures")
+                key .state =OPEN 
+                key .opened_at =time .monotonic ()
+
+    def get_status (self )->List [dict ]:
+        with self .lock :
+            self ._available (time .monotonic (),())
+            return [key .to_dict ()for key in self .keys ]
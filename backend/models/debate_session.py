@@ -0,0 +1,155 @@
+"""
+Debate Session Model - One Document per Debate
+Carries the user's state and running aggregates so a turn never rescans history
+"""
+
+from datetime import datetime ,timezone 
+from typing import Dict ,List ,Optional 
+
+from bson import ObjectId 
+
+from models .user_state import UserState 
+from intelligence .session_drift import SessionDrift 
+from intelligence .judge_state import JudgeState 
+
+
+OVERVIEW_PROJECTION ={
+"user_id":1 ,"topic":1 ,"version":1 ,"stats":1 ,"summary_id":1 ,"created_at":1 ,"updated_at":1 ,
+"user_state.difficulty_level":1 ,"drift.mean_drift_score":1 ,
+"judge_state.turns":1 ,"judge_state.sums":1 
+}
+
+
+class DebateSession :
+    """
+    A debate session as stored in debate_sessions.
+
+    The document is read once when a turn arrives and written once when it
+    is stored. Writes are compare-and-set on `version`, so two turns racing
+    on the same session can't overwrite each other: the loser reloads and
+    records its turn again on top of the winner's.
+    """
+
+    def __init__ (self ,doc :Dict ,is_new :bool =False ):
+        self .id =doc ["_id"]
+        self .is_new =is_new 
+        self .user_id =doc ["user_id"]
+        self .topic =doc ["topic"]
+        self .version =doc .get ("version",0 )
+        self .user_state =UserState .from_dict (doc .get ("user_state"))
+        self .drift =SessionDrift .from_doc (doc .get ("drift"))
+        self .judge_state =JudgeState (doc .get ("judge_state"))
+        self .debate_ids :List [str ]=list (doc .get ("debate_ids")or [])
+        self .stats =dict (doc .get ("stats")or {
+        "turns":self .judge_state .turns ,
+        "total_turn_score":self .judge_state .sums ["turn_score"],
+        "best_turn_score":0 ,
+        "last_turn_score":None 
+        })
+        self .summary_id =doc .get ("summary_id")
+        self .created_at =doc .get ("created_at")
+        self .updated_at =doc .get ("updated_at")
+        self .recorded =[]
+
+    @classmethod 
+    def new (cls ,user_id :str ,topic :str )->"DebateSession":
+        now =datetime .now (timezone .utc )
+        return cls ({"_id":ObjectId (),"user_id":user_id ,"topic":topic ,"created_at":now ,"updated_at":now },is_new =True )
+
+    @classmethod 
+    def load (cls ,collection ,session_id ,user_id :str ,topic :Optional [str ]=None )->Optional ["DebateSession"]:
+        """The user's session, or None if it doesn't exist (or is for another topic)"""
+        query ={"_id":ObjectId (session_id ),"user_id":user_id }
+        if topic is not None :
+            query ["topic"]=topic 
+        doc =collection .find_one (query )
+        return cls (doc )if doc else None 
+
+    @property 
+    def session_id (self )->str :
+        return str (self .id )
+
+    def record_turn (self ,debate_id :str ,argument :str ,ai_reply :str ,metrics :Dict ,drift_score :float ,
+    turn_score :int ,difficulty_level :int ,topic_embedding =None ,argument_embedding =None )->Dict :
+        """
+        Fold one turn into the session
+
+        Returns:
+            Session drift signals after the turn
+        """
+        self .recorded .append ((debate_id ,argument ,ai_reply ,metrics ,drift_score ,turn_score ,
+        difficulty_level ,topic_embedding ,argument_embedding ))
+        self .user_state .update_from_metrics (metrics ,drift_score )
+        self .user_state .difficulty_level =difficulty_level 
+
+        signals =self .drift .update (drift_score ,topic_embedding ,argument_embedding )
+        self .judge_state .update (argument ,ai_reply ,metrics ,drift_score ,difficulty_level ,turn_score )
+
+        self .debate_ids .append (debate_id )
+        self .stats ["turns"]+=1 
+        self .stats ["total_turn_score"]+=turn_score 
+        self .stats ["best_turn_score"]=max (self .stats ["best_turn_score"],turn_score )
+        self .stats ["last_turn_score"]=turn_score 
+        self .updated_at =datetime .now (timezone .utc )
+        return signals 
+
+    def to_doc (self )->Dict :
+        return {
+        "_id":self .id ,
+        "user_id":self .user_id ,
+        "topic":self .topic ,
+        "version":self .version ,
+        "user_state":self .user_state .to_dict (),
+        "drift":self .drift .to_doc (),
+        "judge_state":self .judge_state .to_doc (),
+        "debate_ids":self .debate_ids ,
+        "stats":self .stats ,
+        "summary_id":self .summary_id ,
+        "created_at":self .created_at ,
+        "updated_at":self .updated_at 
+        }
+
+    def save (self ,collection )->bool :
+        """
+        Write the session in one round-trip
+
+        Returns:
+            False if another turn updated the session since it was loaded
+        """
+        doc =self .to_doc ()
+        if self .is_new :
+            doc ["version"]=1 
+            collection .insert_one (doc )
+            self .is_new =False 
+        else :
+            for key in ("_id","user_id","topic","created_at","version","summary_id"):
+                doc .pop (key )
+            result =collection .update_one (
+            {"_id":self .id ,"version":self .version or {"$exists":False }},
+            {"$set":doc ,"$inc":{"version":1 }}
+            )
+            if result .matched_count ==0 :
+                return False 
+        self .version +=1 
+        return True 
+
+    def overview (self )->Dict :
+        """Precomputed per-session numbers for the dashboard"""
+        turns =self .stats ["turns"]
+        averages =self .judge_state .averages ()
+        return {
+        "session_id":self .session_id ,
+        "topic":self .topic ,
+        "turns":turns ,
+        "avg_turn_score":round (self .stats ["total_turn_score"]/turns ,1 )if turns else 0 ,
+        "best_turn_score":self .stats ["best_turn_score"],
+        "last_turn_score":self .stats ["last_turn_score"],
+        "avg_coherence":round (averages ["avg_coherence"],1 ),
+        "avg_vocab":round (averages ["avg_vocab"],1 ),
+        "total_fallacies":averages ["total_fallacies"],
+        "mean_drift_score":round (self .drift .mean_drift_score ,3 ),
+        "difficulty_level":self .user_state .difficulty_level ,
+        "summary_id":self .summary_id ,
+        "created_at":self .created_at ,
+        "updated_at":self .updated_at 
+        }
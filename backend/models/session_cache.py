@@ -0,0 +1,273 @@
+"""
+Session Cache - In-Process Debate Session State with Write-Behind
+Serves a session's latest state from memory and batches writes to MongoDB
+"""
+
+import threading 
+import time 
+from collections import OrderedDict 
+from typing import Dict ,List ,Optional 
+
+from bson import ObjectId 
+from pymongo import UpdateOne 
+
+from models .debate_session import DebateSession 
+
+
+class _Entry :
+    def __init__ (self ,doc :Dict ,stored_version :int ):
+        self .doc =doc 
+        self .stored_version =stored_version 
+        self .pending :List [tuple ]=[]
+        self .dirty_since :Optional [float ]=None 
+
+
+class SessionCache :
+    """
+    Bounded LRU of debate session documents keyed by (user, session).
+
+    - load() serves the cached document, so a turn that follows one handled
+      by this worker skips the MongoDB read
+    - save() is compare-and-set on the session version against the cached
+      copy and marks the entry dirty; new sessions are inserted right away
+      so other workers can find them
+    - a background thread flushes dirty entries every `flush_interval`
+      seconds in one bulk_write, each update conditioned on the version last
+      stored; if another worker moved the document on, it is reloaded and
+      this worker's pending turns are recorded again on top of it
+    - dirty entries are flushed before they are evicted
+    """
+
+    def __init__ (self ,collection ,max_entries :int ,flush_interval :float ):
+        self .collection =collection 
+        self .max_entries =max_entries 
+        self .flush_interval =flush_interval 
+
+        self ._entries :"OrderedDict[tuple, _Entry]"=OrderedDict ()
+        self ._lock =threading .Lock ()
+        self ._flush_lock =threading .Lock ()
+        self ._stopping =threading .Event ()
+        self ._thread =None 
+
+        self .hits =0 
+        self .misses =0 
+        self .evictions =0 
+        self .conflicts =0 
+        self .flushes =0 
+        self .flushed_sessions =0 
+        self .flush_errors =0 
+        self .total_flush_lag =0.0 
+        self .max_flush_lag =0.0 
+
+    def start (self ):
+        if self ._thread is None and self .flush_interval >0 :
+            self ._thread =threading .Thread (target =self ._run ,name ="session-flush",daemon =True )
+            self ._thread .start ()
+
+    def stop (self ):
+        """Stop the flusher and write out everything still dirty"""
+        self ._stopping .set ()
+        self .flush ()
+
+    def _run (self ):
+        while not self ._stopping .wait (self .flush_interval ):
+            try :
+                self .flush ()
+            except Exception as e :
+                with self ._lock :
+                    self .flush_errors +=1 
+                print (f"⚠️  Session flush failed: {e }")
+
+    def load (self ,session_id ,user_id :str ,topic :Optional [str ]=None )->Optional [DebateSession ]:
+        """The user's session (a private copy), or None if it doesn't exist"""
+        key =(user_id ,str (session_id ))
+        with self ._lock :
+            entry =self ._entries .get (key )
+            if entry is not None :
+                self ._entries .move_to_end (key )
+                self .hits +=1 
+                doc =entry .doc 
+            else :
+                self .misses +=1 
+                doc =None 
+
+        if doc is None :
+            doc =self .collection .find_one ({"_id":ObjectId (session_id ),"user_id":user_id })
+            if doc is None :
+                return None 
+            self ._store (key ,_Entry (doc ,doc .get ("version",0 )))
+
+        if topic is not None and doc ["topic"]!=topic :
+            return None 
+        return DebateSession (doc )
+
+    def save (self ,session :DebateSession )->bool :
+        """
+        Publish a session after record_turn()
+
+        Returns:
+            False if the cached session moved on since `session` was loaded;
+            the caller should load() again and record its turn on that
+        """
+        key =(session .user_id ,session .session_id )
+        if session .is_new :
+            session .save (self .collection )
+            self ._store (key ,_Entry (session .to_doc (),session .version ))
+            session .recorded =[]
+            return True 
+
+        with self ._lock :
+            entry =self ._entries .get (key )
+            if entry is not None :
+                if entry .doc .get ("version",0 )!=session .version :
+                    self .conflicts +=1 
+                    return False 
+                session .version +=1 
+                entry .doc =session .to_doc ()
+                entry .pending .extend (session .recorded )
+                session .recorded =[]
+                if entry .dirty_since is None :
+                    entry .dirty_since =time .monotonic ()
+                self ._entries .move_to_end (key )
+                return True 
+
+        if not session .save (self .collection ):
+            return False 
+        session .recorded =[]
+        self ._store (key ,_Entry (session .to_doc (),session .version ))
+        return True 
+
+    def _store (self ,key :tuple ,entry :_Entry ):
+        evicted =[]
+        with self ._lock :
+            current =self ._entries .get (key )
+            if current is not None and current .doc .get ("version",0 )>=entry .doc .get ("version",0 ):
+                return 
+            self ._entries [key ]=entry 
+            self ._entries .move_to_end (key )
+            while len (self ._entries )>self .max_entries :
+                evicted .append (self ._entries .popitem (last =False ))
+                self .evictions +=1 
+
+        dirty =[(k ,e )for k ,e in evicted if e .dirty_since is not None ]
+        if dirty :
+            self ._write (dirty )
+
+    def flush (self )->int :
+        """Write all dirty sessions; returns how many were written"""
+        with self ._lock :
+            dirty =[(key ,entry )for key ,entry in self ._entries .items ()if entry .dirty_since is not None ]
+        if not dirty :
+            return 0 
+        return self ._write (dirty )
+
+    def _write (self ,dirty :List [tuple ])->int :
+        with self ._flush_lock :
+            batch =[]
+            with self ._lock :
+                for key ,entry in dirty :
+                    if entry .dirty_since is None :
+                        continue 
+                    batch .append ((key ,entry ,entry .doc ,entry .stored_version ,list (entry .pending ),entry .dirty_since ))
+            if not batch :
+                return 0 
+
+            operations =[]
+            tokens ={}
+            for key ,entry ,doc ,stored_version ,pending ,dirty_since in batch :
+                fields ={k :v for k ,v in doc .items ()if k not in ("_id","user_id","topic","created_at","summary_id")}
+                fields ["write_token"]=tokens [doc ["_id"]]=ObjectId ()
+                operations .append (UpdateOne (
+                {"_id":doc ["_id"],"version":stored_version or {"$exists":False }},
+                {"$set":fields }
+                ))
+            result =self .collection .bulk_write (operations ,ordered =False )
+
+            conflicted =set ()
+            if result .matched_count <len (batch ):
+                ids =[doc ["_id"]for _ ,_ ,doc ,_ ,_ ,_ in batch ]
+                stored ={
+                d ["_id"]:d .get ("write_token")
+                for d in self .collection .find ({"_id":{"$in":ids }},{"write_token":1 })
+                }
+                conflicted ={_id for _id ,token in tokens .items ()if stored .get (_id )!=token }
+
+            now =time .monotonic ()
+            written =0 
+            with self ._lock :
+                for item in batch :
+                    key ,entry ,doc ,stored_version ,pending ,dirty_since =item 
+                    if doc ["_id"]in conflicted :
+                        continue 
+                    written +=1 
+                    entry .stored_version =doc ["version"]
+                    del entry .pending [:len (pending )]
+                    if entry .doc is doc :
+                        entry .dirty_since =None 
+                    lag =now -dirty_since 
+                    self .total_flush_lag +=lag 
+                    self .max_flush_lag =max (self .max_flush_lag ,lag )
+                self .flushes +=1 
+                self .flushed_sessions +=written 
+
+            for key ,entry ,doc ,stored_version ,pending ,dirty_since in batch :
+                if doc ["_id"]in conflicted :
+                    written +=self ._merge (key ,entry )
+            return written 
+
+    def _merge (self ,key :tuple ,entry :_Entry )->int :
+        """Another worker wrote the session: record our pending turns on its version"""
+        user_id ,session_id =key 
+        for _ in range (3 ):
+            with self ._lock :
+                self .conflicts +=1 
+                pending =list (entry .pending )
+            fresh =DebateSession .load (self .collection ,session_id ,user_id )
+            if fresh is None :
+                break 
+            for turn in pending :
+                fresh .record_turn (*turn )
+            if fresh .save (self .collection ):
+                print (f"♻️  Merged {len (pending )} cached turn(s) into session {session_id }")
+                with self ._lock :
+                    if self ._entries .get (key )is entry :
+                        merged =_Entry (fresh .to_doc (),fresh .version )
+                        later =entry .pending [len (pending ):]
+                        if later :
+                            for turn in later :
+                                fresh .record_turn (*turn )
+                            fresh .version +=1 
+                            merged .doc =fresh .to_doc ()
+                            merged .pending =list (later )
+                            merged .dirty_since =entry .dirty_since 
+                        self ._entries [key ]=merged 
+                return 1 
+
+        print (f"⚠️  Dropping cached state of session {session_id } after repeated conflicts")
+        with self ._lock :
+            if self ._entries .get (key )is entry :
+                del self ._entries [key ]
+        return 0 
+
+    def get_stats (self )->dict :
+        now =time .monotonic ()
+        with self ._lock :
+            lookups =self .hits +self .misses 
+            dirty_ages =[now -e .dirty_since for e in self ._entries .values ()if e .dirty_since is not None ]
+            return {
+            "cached_sessions":len (self ._entries ),
+            "max_sessions":self .max_entries ,
+            "hits":self .hits ,
+            "misses":self .misses ,
+            "hit_rate":round (self .hits /lookups ,3 )if lookups else 0.0 ,
+            "evictions":self .evictions ,
+            "conflicts":self .conflicts ,
+            "dirty_sessions":len (dirty_ages ),
+            "oldest_dirty_seconds":round (max (dirty_ages ),3 )if dirty_ages else 0.0 ,
+            "flush_interval":self .flush_interval ,
+            "flushes":self .flushes ,
+            "flushed_sessions":self .flushed_sessions ,
+            "flush_errors":self .flush_errors ,
+            "avg_flush_lag":round (self .total_flush_lag /self .flushed_sessions ,3 )if self .flushed_sessions else 0.0 ,
+            "max_flush_lag":round (self .max_flush_lag ,3 )
+            }
@@ -16,6 +16,17 @@ class UserState :
         self .difficulty_level =3 
         self .turn_count =0 
 
+    @classmethod 
+    def from_dict (cls ,data ):
+        """
+        Restore a state saved with to_dict (a fresh state if data is empty).
+        """
+        state =cls ()
+        for key ,value in (data or {}).items ():
+            if hasattr (state ,key ):
+                setattr (state ,key ,value )
+        return state 
+
     def update_from_metrics (self ,metrics ,drift_score ):
         """
         Update user state using latest analysis results.
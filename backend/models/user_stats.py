@@ -0,0 +1,98 @@
+"""
+User Stats - Precomputed Dashboard Numbers
+One document per user, kept current with $inc as turns and summaries are stored
+"""
+
+import os 
+from datetime import datetime 
+from typing import Dict 
+
+from pymongo import UpdateOne 
+
+
+USER_STATS_TREND =int (os .getenv ("USER_STATS_TREND",20 ))
+
+METRIC_KEYS =("logical_coherence","vocabulary_level","aggression_level","fallacy_count")
+
+
+def record_turn (writer ,user_id :str ,metrics :Dict ,drift_score :float ,turn_score :int ,
+created_at :datetime ,new_session :bool =False ):
+    """
+    Fold one stored turn into the user's stats (single upsert)
+
+    Args:
+        writer: BatchWriter for the user_stats collection
+        user_id: Owner of the turn
+        metrics: Turn metrics
+        drift_score: Turn drift score
+        turn_score: calculate_quick_score result
+        created_at: When the turn was stored
+        new_session: Whether the turn started a session
+    """
+    increments ={
+    "turns":1 ,
+    "sessions":1 if new_session else 0 ,
+    "total_turn_score":turn_score ,
+    "total_drift_score":drift_score 
+    }
+    for key in METRIC_KEYS :
+        increments [f"totals.{key }"]=metrics .get (key ,0 )
+
+    writer .submit (UpdateOne (
+    {"_id":user_id },
+    {
+    "$inc":increments ,
+    "$set":{"last_turn_at":created_at },
+    "$push":{"turn_trend":{
+    "$each":[{
+    "turn_score":turn_score ,
+    "drift_score":round (drift_score ,3 ),
+    "logical_coherence":metrics .get ("logical_coherence",0 ),
+    "vocabulary_level":metrics .get ("vocabulary_level",0 ),
+    "aggression_level":metrics .get ("aggression_level",0 ),
+    "created_at":created_at 
+    }],
+    "$slice":-USER_STATS_TREND 
+    }}
+    },
+    upsert =True 
+    ))
+
+
+def record_summary (writer ,user_id :str ,overall_score :int ,created_at :datetime ):
+    """Count a stored judge summary and keep its score in the trend"""
+    writer .submit (UpdateOne (
+    {"_id":user_id },
+    {
+    "$inc":{"summaries":1 ,"total_summary_score":overall_score },
+    "$push":{"summary_trend":{
+    "$each":[{"overall_score":overall_score ,"created_at":created_at }],
+    "$slice":-USER_STATS_TREND 
+    }}
+    },
+    upsert =True 
+    ))
+
+
+def stats_view (doc :Dict )->Dict :
+    """Averages and trends for the dashboard from a user_stats document"""
+    doc =doc or {}
+    turns =doc .get ("turns",0 )
+    summaries =doc .get ("summaries",0 )
+    totals =doc .get ("totals",{})
+
+    averages ={key :round (totals .get (key ,0 )/turns ,2 )if turns else 0 for key in METRIC_KEYS }
+    averages ["turn_score"]=round (doc .get ("total_turn_score",0 )/turns ,1 )if turns else 0 
+    averages ["drift_score"]=round (doc .get ("total_drift_score",0 )/turns ,3 )if turns else 0 
+    averages ["overall_score"]=round (doc .get ("total_summary_score",0 )/summaries ,1 )if summaries else 0 
+
+    return {
+    "turns":turns ,
+    "sessions":doc .get ("sessions",0 ),
+    "summaries":summaries ,
+    "total_fallacies":totals .get ("fallacy_count",0 ),
+    "averages":averages ,
+    "turn_trend":doc .get ("turn_trend",[]),
+    "summary_trend":doc .get ("summary_trend",[]),
+    "last_turn_at":doc .get ("last_turn_at")
+    }
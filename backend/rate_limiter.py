@@ -0,0 +1,178 @@
+"""
+Rate Limiter - Token Buckets per API Key
+Admits Gemini calls before they go out instead of sleeping after a 429
+"""
+
+import os 
+import random 
+import threading 
+import time 
+from typing import Dict ,Optional 
+
+
+class RateLimitExceeded (Exception ):
+    """
+    Raised when a call cannot be admitted before its deadline.
+    retry_after tells the caller how long the key needs before it has capacity again.
+    """
+
+    def __init__ (self ,key_name :str ,retry_after :float ):
+        self .key_name =key_name 
+        self .retry_after =retry_after 
+        super ().__init__ (f"Rate limit on {key_name }: retry after {retry_after :.1f}s")
+
+
+def estimate_tokens (text :str )->int :
+    """Rough token estimate (~4 characters per token) for TPM accounting"""
+    return len (text )//4 +1 
+
+
+class TokenBucket :
+    """
+    Token bucket with a request budget (RPM) and a token budget (TPM).
+
+    Both budgets refill continuously. Reservations are taken up front and may
+    drive a budget negative, which is how queued callers line up behind each
+    other. A quota error from upstream puts the bucket into a jittered cooldown
+    shared by every caller of the key, so workers don't all retry at once.
+    """
+
+    def __init__ (self ,rpm :int ,tpm :int ):
+        self .rpm =rpm 
+        self .tpm =tpm 
+        self .requests =float (rpm )
+        self .tokens =float (tpm )
+        self .cooldown_until =0.0 
+        self .updated =time .monotonic ()
+        self .lock =threading .Lock ()
+
+        self .admitted =0 
+        self .delayed =0 
+        self .rejected =0 
+        self .penalties =0 
+
+    def _refill (self ,now :float ):
+        elapsed =now -self .updated 
+        self .requests =min (self .rpm ,self .requests +elapsed *self .rpm /60.0 )
+        if self .tpm :
+            self .tokens =min (self .tpm ,self .tokens +elapsed *self .tpm /60.0 )
+        self .updated =now 
+
+    def _wait_time (self ,now :float )->float :
+        wait =max (0.0 ,self .cooldown_until -now )
+        if self .requests <0 :
+            wait =max (wait ,-self .requests *60.0 /self .rpm )
+        if self .tpm and self .tokens <0 :
+            wait =max (wait ,-self .tokens *60.0 /self .tpm )
+        return wait 
+
+    def reserve (self ,key_name :str ,tokens :int =0 ,deadline :Optional [float ]=None )->float :
+        """
+        Reserve capacity for one call
+
+        Args:
+            key_name: Key label used in errors
+            tokens: Estimated prompt + output tokens for the call
+            deadline: Longest acceptable queue wait in seconds (None = unbounded)
+
+        Returns:
+            Seconds to wait before sending the call
+        """
+        with self .lock :
+            now =time .monotonic ()
+            self ._refill (now )
+
+            self .requests -=1 
+            self .tokens -=min (tokens ,self .tpm )if self .tpm else 0 
+            wait =self ._wait_time (now )
+
+            if deadline is not None and wait >deadline :
+                self .requests +=1 
+                self .tokens +=min (tokens ,self .tpm )if self .tpm else 0 
+                self .rejected +=1 
+                raise RateLimitExceeded (key_name ,wait )
+
+            self .admitted +=1 
+            if wait >0 :
+                self .delayed +=1 
+            return wait 
+
+    def penalize (self ,backoff :float )->float :
+        """
+        Push the bucket into a cooldown after an upstream quota error
+
+        Args:
+            backoff: Base backoff in seconds; full jitter is applied on top
+
+        Returns:
+            Seconds until the key admits calls again
+        """
+        with self .lock :
+            now =time .monotonic ()
+            self ._refill (now )
+            cooldown =random .uniform (backoff /2 ,backoff )
+            self .cooldown_until =max (self .cooldown_until ,now +cooldown )
+            self .penalties +=1 
+            return self .cooldown_until -now 
+
+    def retry_after (self )->float :
+        """Seconds until the bucket can admit one more call"""
+        with self .lock :
+            now =time .monotonic ()
+            self ._refill (now )
+            self .requests -=1 
+            wait =self ._wait_time (now )
+            self .requests +=1 
+            return wait 
+
+    def get_stats (self )->dict :
+        with self .lock :
+            now =time .monotonic ()
+            self ._refill (now )
+            return {
+            "rpm":self .rpm ,
+            "tpm":self .tpm ,
+            "available_requests":round (max (self .requests ,0.0 ),2 ),
+            "available_tokens":int (max (self .tokens ,0.0 )),
+            "cooldown_remaining":round (max (0.0 ,self .cooldown_until -now ),2 ),
+            "admitted":self .admitted ,
+            "delayed":self .delayed ,
+            "rejected":self .rejected ,
+            "penalties":self .penalties 
+            }
+
+
+class RateLimiter :
+    """
+    Registry of token buckets, one per API key.
+    Limits are read from GEMINI_<PURPOSE>_RPM / GEMINI_<PURPOSE>_TPM,
+    falling back to GEMINI_RPM / GEMINI_TPM.
+
+    Buckets live in each process, so N gunicorn workers would admit N times
+    the configured rate. The limits are per key across the deployment and are
+    divided by WEB_CONCURRENCY (gunicorn's worker count setting, default 1),
+    so keep it in sync with the number of workers.
+    """
+
+    def __init__ (self ):
+        self .processes =max (1 ,int (os .getenv ("WEB_CONCURRENCY",1 )))
+        self .default_rpm =int (os .getenv ("GEMINI_RPM",15 ))
+        self .default_tpm =int (os .getenv ("GEMINI_TPM",250000 ))
+        self ._buckets :Dict [str ,TokenBucket ]={}
+        self ._lock =threading .Lock ()
+
+    def bucket (self ,api_key :str ,purpose :str ="")->TokenBucket :
+        """Get or create the bucket for an API key"""
+        bucket =self ._buckets .get (api_key )
+        if bucket is not None :
+            return bucket 
+
+        with self ._lock :
+            bucket =self ._buckets .get (api_key )
+            if bucket is None :
+                prefix =f"GEMINI_{purpose .upper ()}_"if purpose else "GEMINI_"
+                rpm =int (os .getenv (f"{prefix }RPM",self .default_rpm ))
+                tpm =int (os .getenv (f"{prefix }TPM",self .default_tpm ))
+                bucket =TokenBucket (max (1 ,rpm //self .processes ),tpm //self .processes )
+                self ._buckets [api_key ]=bucket 
+            return bucket 
@@ -0,0 +1,18 @@
+import os
+import sys
+
+# Backend modules import each other from the backend root (e.g. `from rate_limiter import ...`)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class FakeClock:
+    """Stand-in for the time module so tests control time.monotonic()"""
+
+    def __init__(self, start=1000.0):
+        self.now = start
+
+    def monotonic(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
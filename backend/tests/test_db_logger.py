@@ -0,0 +1,105 @@
+import threading
+
+from pymongo import InsertOne
+from pymongo.errors import BulkWriteError
+
+from utils.db_logger import BatchWriter
+
+
+class FakeCollection:
+    """
+    bulk_write stand-in. Each queued error is raised by one call; an int N
+    stands for an ordered write that applies operations before N and fails
+    on operation N.
+    """
+
+    name = "fake"
+
+    def __init__(self, errors=()):
+        self.errors = list(errors)
+        self.written = []
+        self.flushed = threading.Event()
+
+    def bulk_write(self, operations, ordered=True):
+        error = self.errors.pop(0) if self.errors else None
+        if isinstance(error, int):
+            self.written.extend(op._doc for op in operations[:error])
+            raise BulkWriteError({"writeErrors": [{"index": error, "errmsg": "duplicate key"}]})
+        if error is not None:
+            raise error
+        self.written.extend(op._doc for op in operations)
+        self.flushed.set()
+
+
+def test_failed_operation_is_skipped_and_rest_written():
+    collection = FakeCollection([1])
+    writer = BatchWriter(collection)
+
+    writer._write([InsertOne({"n": n}) for n in range(4)])
+
+    assert collection.written == [{"n": 0}, {"n": 2}, {"n": 3}]
+    stats = writer.get_stats()
+    assert stats["written"] == 3 and stats["failed"] == 1
+
+
+def test_write_concern_only_error_counts_as_written():
+    collection = FakeCollection([
+        BulkWriteError({"writeErrors": [], "writeConcernErrors": [{"errmsg": "waiting for replication timed out"}]})
+    ])
+    writer = BatchWriter(collection)
+
+    writer._write([InsertOne({"n": n}) for n in range(3)])
+
+    stats = writer.get_stats()
+    assert stats["written"] == 3 and stats["failed"] == 0
+
+
+def test_unexpected_error_fails_the_batch():
+    collection = FakeCollection([RuntimeError("connection reset")])
+    writer = BatchWriter(collection)
+
+    writer._write([InsertOne({"n": n}) for n in range(3)])
+
+    assert writer.get_stats()["failed"] == 3
+
+
+def test_flush_thread_survives_a_failing_flush(monkeypatch):
+    collection = FakeCollection()
+    writer = BatchWriter(collection, flush_interval=0.01)
+
+    real_flush = writer._flush
+    failures = []
+
+    def flaky_flush(batch):
+        if not failures:
+            failures.append(batch)
+            raise KeyError("unexpected")
+        real_flush(batch)
+
+    monkeypatch.setattr(writer, "_flush", flaky_flush)
+    writer.start()
+    writer.insert({"n": 1})
+    for _ in range(200):
+        if failures:
+            break
+        threading.Event().wait(0.01)
+
+    writer.insert({"n": 2})
+    assert collection.flushed.wait(2)
+    assert writer._thread.is_alive()
+    writer.stop()
+
+    assert collection.written == [{"n": 2}]
+    assert writer.get_stats()["failed"] == 1
+
+
+def test_stop_drains_buffer():
+    collection = FakeCollection()
+    writer = BatchWriter(collection, max_batch=2, flush_interval=60)
+    for n in range(5):
+        writer.insert({"n": n})
+
+    writer.stop()
+
+    assert collection.written == [{"n": n} for n in range(5)]
+    assert writer.get_stats()["buffered"] == 0
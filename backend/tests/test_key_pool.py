@@ -0,0 +1,119 @@
+import pytest
+
+import key_pool
+import rate_limiter
+from key_pool import CLOSED, HALF_OPEN, OPEN, KeyPool
+from rate_limiter import RateLimitExceeded, RateLimiter
+from conftest import FakeClock
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(key_pool, "time", clock)
+    monkeypatch.setattr(rate_limiter, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def make_pool(monkeypatch, clock):
+    monkeypatch.setenv("GEMINI_RPM", "1000")
+    monkeypatch.setenv("GEMINI_BREAKER_THRESHOLD", "2")
+    monkeypatch.setenv("GEMINI_BREAKER_COOLDOWN", "30")
+    monkeypatch.delenv("WEB_CONCURRENCY", raising=False)
+
+    def make_pool(*keys):
+        return KeyPool("debate", list(keys), RateLimiter())
+    return make_pool
+
+
+def test_breaker_opens_after_threshold(make_pool):
+    pool = make_pool("a")
+    key = pool.keys[0]
+
+    pool.record_failure(key)
+    assert key.state == CLOSED
+    pool.record_failure(key)
+    assert key.state == OPEN
+
+    with pytest.raises(RateLimitExceeded) as error:
+        pool.acquire()
+    assert error.value.retry_after == pytest.approx(30)
+
+
+def test_half_open_allows_a_single_probe(make_pool, clock):
+    pool = make_pool("a")
+    key = pool.keys[0]
+    pool.record_failure(key)
+    pool.record_failure(key)
+
+    clock.advance(30)
+    probe, _ = pool.acquire()
+    assert probe is key and key.state == HALF_OPEN
+
+    with pytest.raises(RateLimitExceeded):
+        pool.acquire()
+
+
+def test_successful_probe_closes_breaker(make_pool, clock):
+    pool = make_pool("a")
+    key = pool.keys[0]
+    pool.record_failure(key)
+    pool.record_failure(key)
+    clock.advance(30)
+
+    pool.acquire()
+    pool.record_success(key, 0.2)
+    assert key.state == CLOSED
+    assert key.consecutive_failures == 0
+    pool.acquire()
+    pool.acquire()
+
+
+def test_failed_probe_reopens_breaker(make_pool, clock):
+    pool = make_pool("a")
+    key = pool.keys[0]
+    pool.record_failure(key)
+    pool.record_failure(key)
+    clock.advance(30)
+
+    pool.acquire()
+    pool.record_failure(key)
+    assert key.state == OPEN
+    with pytest.raises(RateLimitExceeded):
+        pool.acquire()
+
+
+def test_neutral_probe_leaves_breaker_half_open(make_pool, clock):
+    pool = make_pool("a")
+    key = pool.keys[0]
+    pool.record_failure(key)
+    pool.record_failure(key)
+    clock.advance(30)
+
+    pool.acquire()
+    latency = key.latency_ewma
+    pool.record_neutral(key)
+    assert key.state == HALF_OPEN
+    assert key.latency_ewma == latency
+
+    probe, _ = pool.acquire()
+    assert probe is key
+
+
+def test_open_key_is_skipped(make_pool):
+    pool = make_pool("a", "b")
+    broken, healthy = pool.keys
+    pool.record_failure(broken)
+    pool.record_failure(broken)
+
+    for _ in range(5):
+        key, _ = pool.acquire()
+        assert key is healthy
+
+
+def test_status_does_not_expose_keys(make_pool):
+    pool = make_pool("secret-key-1234", "secret-key-5678")
+    status = str(pool.get_status())
+    assert "1234" not in status and "5678" not in status
+    assert "DEBATE_KEY#2" in status
@@ -0,0 +1,68 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from bson import ObjectId
+
+from utils.pagination import MAX_PAGE_SIZE, decode_cursor, encode_cursor, keyset_page, page_size
+
+
+def test_cursor_round_trip():
+    timestamp = datetime(2026, 10, 18, 4, 5, 6, 123000, tzinfo=timezone.utc)
+    object_id = ObjectId()
+    assert decode_cursor(encode_cursor(timestamp, object_id)) == (timestamp, object_id)
+
+
+def test_cursor_round_trip_naive_timestamp():
+    timestamp = datetime(2026, 1, 2, 3, 4, 5)
+    object_id = ObjectId()
+    assert decode_cursor(encode_cursor(timestamp, object_id)) == (timestamp, object_id)
+
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", "eyJ0IjogMX0"])
+def test_malformed_cursor_raises_value_error(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_page_size_is_clamped():
+    assert page_size("5", 20) == 5
+    assert page_size("0", 20) == 1
+    assert page_size("100000", 20) == MAX_PAGE_SIZE
+    assert page_size(None, 20) == 20
+    assert page_size("abc", 20) == 20
+
+
+def test_keyset_pages_cover_every_document_once():
+    mongomock = pytest.importorskip("mongomock")
+    collection = mongomock.MongoClient().debate_platform.debates
+
+    start = datetime(2026, 10, 1)
+    # Repeated timestamps make the _id tie-break matter
+    for i in range(23):
+        collection.insert_one({"user_id": "u1", "n": i, "created_at": start + timedelta(minutes=i // 3)})
+    collection.insert_one({"user_id": "u2", "n": 99, "created_at": start})
+
+    seen = []
+    cursor = None
+    while True:
+        docs, cursor = keyset_page(collection, {"user_id": "u1"}, {"n": 1}, "created_at", 5, cursor)
+        assert len(docs) <= 5
+        seen.extend(docs)
+        if cursor is None:
+            break
+
+    assert len(seen) == 23
+    assert len({doc["_id"] for doc in seen}) == 23
+    keys = [(doc["created_at"], doc["_id"]) for doc in seen]
+    assert keys == sorted(keys, reverse=True)
+    assert set(seen[0]) == {"_id", "n", "created_at"}
+
+
+def test_last_page_has_no_cursor():
+    mongomock = pytest.importorskip("mongomock")
+    collection = mongomock.MongoClient().debate_platform.debates
+    for i in range(5):
+        collection.insert_one({"user_id": "u1", "created_at": datetime(2026, 10, 1, 0, i)})
+
+    docs, cursor = keyset_page(collection, {"user_id": "u1"}, None, "created_at", 5)
+    assert len(docs) == 5 and cursor is None
@@ -0,0 +1,86 @@
+import pytest
+
+import rate_limiter
+from rate_limiter import RateLimitExceeded, RateLimiter, TokenBucket
+from conftest import FakeClock
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter, "time", clock)
+    monkeypatch.setattr(rate_limiter.random, "uniform", lambda low, high: high)
+    return clock
+
+
+def test_reserve_admits_within_budget(clock):
+    bucket = TokenBucket(rpm=3, tpm=0)
+    assert [bucket.reserve("k") for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.get_stats()["admitted"] == 3
+
+
+def test_reserve_queues_behind_exhausted_budget(clock):
+    bucket = TokenBucket(rpm=60, tpm=0)
+    for _ in range(60):
+        bucket.reserve("k")
+    assert bucket.reserve("k") == pytest.approx(1.0)
+    assert bucket.reserve("k") == pytest.approx(2.0)
+    assert bucket.get_stats()["delayed"] == 2
+
+
+def test_reserve_refills_over_time(clock):
+    bucket = TokenBucket(rpm=60, tpm=0)
+    for _ in range(60):
+        bucket.reserve("k")
+    clock.advance(5)
+    for _ in range(5):
+        assert bucket.reserve("k") == 0.0
+    assert bucket.reserve("k") > 0
+
+
+def test_reserve_over_deadline_raises_and_refunds(clock):
+    bucket = TokenBucket(rpm=60, tpm=0)
+    for _ in range(60):
+        bucket.reserve("k")
+
+    with pytest.raises(RateLimitExceeded) as error:
+        bucket.reserve("k", deadline=0.5)
+    assert error.value.retry_after == pytest.approx(1.0)
+    assert bucket.get_stats()["rejected"] == 1
+
+    # The rejected reservation was given back, so the queue did not grow
+    assert bucket.reserve("k", deadline=1.0) == pytest.approx(1.0)
+
+
+def test_token_budget_limits_large_calls(clock):
+    bucket = TokenBucket(rpm=1000, tpm=600)
+    assert bucket.reserve("k", tokens=600) == 0.0
+    assert bucket.reserve("k", tokens=60) == pytest.approx(6.0)
+
+
+def test_penalize_applies_shared_cooldown(clock):
+    bucket = TokenBucket(rpm=60, tpm=0)
+    assert bucket.penalize(4) == pytest.approx(4.0)
+    assert bucket.retry_after() == pytest.approx(4.0)
+    assert bucket.reserve("k") == pytest.approx(4.0)
+
+    with pytest.raises(RateLimitExceeded):
+        bucket.reserve("k", deadline=1.0)
+
+    clock.advance(4)
+    assert bucket.reserve("k") == 0.0
+    assert bucket.get_stats()["penalties"] == 1
+
+
+def test_penalize_never_shortens_a_cooldown(clock):
+    bucket = TokenBucket(rpm=60, tpm=0)
+    bucket.penalize(8)
+    assert bucket.penalize(1) == pytest.approx(8.0)
+
+
+def test_limits_are_divided_across_workers(monkeypatch):
+    monkeypatch.setenv("GEMINI_RPM", "30")
+    monkeypatch.setenv("GEMINI_TPM", "1000")
+    monkeypatch.setenv("WEB_CONCURRENCY", "3")
+    bucket = RateLimiter().bucket("key", "debate")
+    assert (bucket.rpm, bucket.tpm) == (10, 333)
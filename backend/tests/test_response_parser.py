@@ -0,0 +1,76 @@
+import random
+
+import pytest
+
+from intelligence.response_parser import CombinedResponseParser, parse_combined_response
+
+
+COUNTER = "Banning cars ignores deliveries, emergency access and people with limited mobility."
+RESPONSE = (
+    "COUNTER_ARGUMENT: " + COUNTER + "\n\n"
+    'ANALYSIS: {"logical_coherence": 7, "vocabulary_level": 6, '
+    '"aggression_level": 2, "fallacy_count": 1, "note": "braces } in strings"}'
+)
+
+
+def stream(chunks):
+    parser = CombinedResponseParser()
+    shown = "".join(parser.feed(chunk) for chunk in chunks)
+    text, counter_argument = parser.finish()
+    return parser, shown + text, counter_argument
+
+
+def split_at(text, cuts):
+    bounds = [0] + sorted(cuts) + [len(text)]
+    return [text[a:b] for a, b in zip(bounds, bounds[1:])]
+
+
+def test_whole_response_in_one_chunk():
+    parser, shown, counter_argument = stream([RESPONSE])
+    assert counter_argument == COUNTER
+    assert shown == COUNTER
+    assert parser.metrics["logical_coherence"] == 7
+    assert parser.metrics["fallacy_count"] == 1
+
+
+@pytest.mark.parametrize("cut", range(1, len(RESPONSE)))
+def test_every_two_chunk_split(cut):
+    parser, shown, counter_argument = stream(split_at(RESPONSE, [cut]))
+    assert counter_argument == COUNTER
+    assert "ANALYSIS" not in shown and "COUNTER_ARGUMENT" not in shown
+    assert parser.metrics is not None and parser.metrics["aggression_level"] == 2
+
+
+def test_random_chunkings():
+    rng = random.Random(7)
+    for _ in range(300):
+        cuts = rng.sample(range(1, len(RESPONSE)), rng.randint(1, 40))
+        parser, shown, counter_argument = stream(split_at(RESPONSE, cuts))
+        assert counter_argument == COUNTER
+        assert shown.replace("\n", "").strip() == COUNTER
+        assert parser.metrics["vocabulary_level"] == 6
+
+
+def test_character_by_character():
+    parser, shown, counter_argument = stream(list(RESPONSE))
+    assert counter_argument == COUNTER
+    assert parser.metrics["note"] == "braces } in strings"
+
+
+def test_metrics_available_before_stream_ends():
+    parser = CombinedResponseParser()
+    parser.feed(RESPONSE)
+    assert parser.in_analysis
+    assert parser.metrics is not None
+
+
+def test_missing_label_still_parses():
+    parser, shown, counter_argument = stream(split_at(RESPONSE[len("COUNTER_ARGUMENT: "):], [10, 50]))
+    assert counter_argument == COUNTER
+
+
+def test_incomplete_analysis_is_rejected():
+    with pytest.raises(ValueError):
+        parse_combined_response("COUNTER_ARGUMENT: Fine.\nANALYSIS: {\"logical_coherence\": 7")
+    with pytest.raises(ValueError):
+        parse_combined_response("Just a reply with no analysis")
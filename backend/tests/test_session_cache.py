@@ -0,0 +1,90 @@
+import pytest
+
+mongomock = pytest.importorskip("mongomock")
+
+from models.debate_session import DebateSession
+from models.session_cache import SessionCache
+
+
+METRICS = {"logical_coherence": 6, "vocabulary_level": 5, "aggression_level": 2, "fallacy_count": 0}
+
+
+@pytest.fixture
+def collection():
+    return mongomock.MongoClient().debate_platform.debate_sessions
+
+
+def record(session, n):
+    session.record_turn(f"debate-{n}", f"argument {n}", f"reply {n}", METRICS, 0.7, 60, 3)
+
+
+def new_session(cache):
+    session = DebateSession.new("u1", "Cars downtown")
+    record(session, 0)
+    assert cache.save(session)
+    return session.id
+
+
+def test_save_is_compare_and_set(collection):
+    cache = SessionCache(collection, max_entries=10, flush_interval=60)
+    session_id = new_session(cache)
+
+    first = cache.load(session_id, "u1")
+    second = cache.load(session_id, "u1")
+    record(first, 1)
+    record(second, 2)
+
+    assert cache.save(first)
+    assert not cache.save(second)
+    assert cache.get_stats()["conflicts"] == 1
+
+
+def test_load_checks_owner_and_topic(collection):
+    cache = SessionCache(collection, max_entries=10, flush_interval=60)
+    session_id = new_session(cache)
+
+    assert cache.load(session_id, "someone-else") is None
+    assert cache.load(session_id, "u1", topic="Another topic") is None
+    assert cache.load(session_id, "u1", topic="Cars downtown") is not None
+
+
+def test_flush_writes_dirty_sessions(collection):
+    cache = SessionCache(collection, max_entries=10, flush_interval=60)
+    session_id = new_session(cache)
+
+    session = cache.load(session_id, "u1")
+    record(session, 1)
+    assert cache.save(session)
+    assert collection.find_one({"_id": session_id})["stats"]["turns"] == 1
+
+    assert cache.flush() == 1
+    stored = collection.find_one({"_id": session_id})
+    assert stored["stats"]["turns"] == 2
+    assert cache.flush() == 0
+
+
+def test_conflicting_flush_merges_pending_turns(collection):
+    # Two workers with their own caches over one collection
+    worker_a = SessionCache(collection, max_entries=10, flush_interval=60)
+    worker_b = SessionCache(collection, max_entries=10, flush_interval=60)
+    session_id = new_session(worker_a)
+
+    session_b = worker_b.load(session_id, "u1")
+    record(session_b, 1)
+    assert worker_b.save(session_b)
+
+    session_a = worker_a.load(session_id, "u1")
+    record(session_a, 2)
+    record(session_a, 3)
+    assert worker_a.save(session_a)
+
+    assert worker_b.flush() == 1
+    assert worker_a.flush() == 1
+
+    stored = DebateSession.load(collection, session_id, "u1")
+    assert stored.stats["turns"] == 4
+    assert sorted(stored.debate_ids) == ["debate-0", "debate-1", "debate-2", "debate-3"]
+    assert worker_a.get_stats()["conflicts"] >= 1
+
+    # The merged copy is what worker A serves next
+    assert worker_a.load(session_id, "u1").stats["turns"] == 4
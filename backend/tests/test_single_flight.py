@@ -0,0 +1,37 @@
+import threading
+
+import pytest
+
+from utils.single_flight import FlightTimeout, SingleFlight
+
+
+def test_followers_share_the_leaders_result():
+    flights = SingleFlight()
+    call, leader = flights.claim("k")
+    follower_call, follower_leader = flights.claim("k")
+    assert leader and not follower_leader and follower_call is call
+
+    results = []
+    thread = threading.Thread(target=lambda: results.append(SingleFlight.wait(follower_call, 2)))
+    thread.start()
+    flights.resolve("k", call, "value")
+    thread.join()
+
+    assert results == ["value"]
+    assert flights.get_stats() == {"in_flight": 0, "leaders": 1, "shared": 1}
+
+
+def test_followers_receive_the_leaders_error():
+    flights = SingleFlight()
+    call, _ = flights.claim("k")
+    flights.resolve("k", call, error=ValueError("boom"))
+    with pytest.raises(ValueError):
+        SingleFlight.wait(call)
+
+
+def test_wait_times_out_while_leader_runs():
+    flights = SingleFlight()
+    call, _ = flights.claim("k")
+    with pytest.raises(FlightTimeout):
+        SingleFlight.wait(call, 0.01)
+    assert flights.get_stats()["in_flight"] == 1
@@ -0,0 +1,94 @@
+"""
+Response Compression - Negotiated gzip / Brotli
+Compresses buffered text responses above a size threshold
+"""
+
+import gzip 
+import threading 
+
+from flask import request 
+
+try :
+    import brotli 
+except ImportError :
+    brotli =None 
+
+
+COMPRESSIBLE_TYPES =("application/json","text/plain","text/html","text/csv")
+
+
+class ResponseCompressor :
+    """
+    after_request hook that compresses responses per Accept-Encoding.
+
+    Brotli is preferred when the brotli package is installed and the client
+    accepts it, then gzip. Streamed responses (SSE), bodiless ones (204,
+    304), already encoded ones and anything under `min_size` bytes pass
+    through untouched. A compressed response gets a weak ETag, since its
+    bytes differ from the identity representation.
+    """
+
+    def __init__ (self ,min_size :int ,gzip_level :int ,brotli_quality :int ):
+        self .min_size =min_size 
+        self .gzip_level =gzip_level 
+        self .brotli_quality =brotli_quality 
+        self ._lock =threading .Lock ()
+
+        self .compressed =0 
+        self .skipped =0 
+        self .bytes_in =0 
+        self .bytes_out =0 
+        self .encodings ={}
+
+    def init_app (self ,app ):
+        app .after_request (self .compress )
+
+    def _encoding (self ):
+        offered =["br","gzip"]if brotli is not None else ["gzip"]
+        return request .accept_encodings .best_match (offered )
+
+    def compress (self ,response ):
+        if (
+        response .status_code <200 or response .status_code in (204 ,304 )
+        or response .direct_passthrough or response .is_streamed 
+        or "Content-Encoding"in response .headers 
+        or response .mimetype not in COMPRESSIBLE_TYPES 
+        ):
+            return response 
+
+        response .vary .add ("Accept-Encoding")
+        encoding =self ._encoding ()
+        body =response .get_data ()
+        if encoding is None or len (body )<self .min_size :
+            with self ._lock :
+                self .skipped +=1 
+            return response 
+
+        if encoding =="br":
+            compressed =brotli .compress (body ,quality =self .brotli_quality )
+        else :
+            compressed =gzip .compress (body ,compresslevel =self .gzip_level )
+
+        response .set_data (compressed )
+        response .headers ["Content-Encoding"]=encoding 
+        etag ,weak =response .get_etag ()
+        if etag and not weak :
+            response .set_etag (etag ,weak =True )
+
+        with self ._lock :
+            self .compressed +=1 
+            self .bytes_in +=len (body )
+            self .bytes_out +=len (compressed )
+            self .encodings [encoding ]=self .encodings .get (encoding ,0 )+1 
+        return response 
+
+    def get_stats (self )->dict :
+        with self ._lock :
+            return {
+            "brotli_available":brotli is not None ,
+            "min_size":self .min_size ,
+            "compressed":self .compressed ,
+            "skipped":self .skipped ,
+            "encodings":dict (self .encodings ),
+            "ratio":round (self .bytes_out /self .bytes_in ,3 )if self .bytes_in else None 
+            }
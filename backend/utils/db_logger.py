@@ -1,8 +1,163 @@
+"""
+DB Logger - Write-Behind Batching for Audit and Analytics Writes
+Buffers secondary writes off the request path and flushes them in bulk
+"""
+
+import queue 
+import threading 
+import time 
 from datetime import datetime ,timezone 
+from typing import List ,Optional 
+
+from pymongo import InsertOne 
+from pymongo .errors import BulkWriteError 
+
+
+class BatchWriter :
+    """
+    Bounded write-behind buffer for one collection.
+
+    submit() queues a pymongo write operation and returns immediately; a
+    background thread sends queued operations with one ordered bulk_write
+    once `max_batch` are waiting or `flush_interval` seconds have passed
+    since the oldest one. When the buffer is full the caller waits up to
+    `put_timeout` and then writes its operation itself, so overflow slows
+    producers down instead of dropping data. stop() drains the buffer.
+    """
+
+    def __init__ (self ,collection ,max_batch :int =100 ,flush_interval :float =1.0 ,
+    max_buffer :int =10000 ,put_timeout :float =0.5 ):
+        self .collection =collection 
+        self .max_batch =max_batch 
+        self .flush_interval =flush_interval 
+        self .put_timeout =put_timeout 
+
+        self ._queue =queue .Queue (maxsize =max_buffer )
+        self ._stopping =threading .Event ()
+        self ._thread =None 
+        self ._lock =threading .Lock ()
+
+        self .submitted =0 
+        self .written =0 
+        self .batches =0 
+        self .overflow_writes =0 
+        self .failed =0 
+        self .max_flush_lag =0.0 
+
+    def start (self ):
+        if self ._thread is None :
+            self ._thread =threading .Thread (target =self ._run ,name =f"batch-{self .collection .name }",daemon =True )
+            self ._thread .start ()
+
+    def stop (self ,timeout :float =10.0 ):
+        """Flush everything still buffered"""
+        self ._stopping .set ()
+        if self ._thread is not None :
+            self ._thread .join (timeout )
+        self ._drain ()
+
+    def submit (self ,operation ):
+        with self ._lock :
+            self .submitted +=1 
+        try :
+            self ._queue .put ((operation ,time .monotonic ()),timeout =self .put_timeout )
+        except queue .Full :
+            with self ._lock :
+                self .overflow_writes +=1 
+            self ._write ([operation ])
+
+    def insert (self ,document :dict ):
+        self .submit (InsertOne (document ))
+
+    def _run (self ):
+        while not self ._stopping .is_set ():
+            try :
+                first =self ._queue .get (timeout =self .flush_interval )
+            except queue .Empty :
+                continue 
+
+            batch =[first ]
+            deadline =first [1 ]+self .flush_interval 
+            while len (batch )<self .max_batch :
+                remaining =deadline -time .monotonic ()
+                if remaining <=0 or self ._stopping .is_set ():
+                    break 
+                try :
+                    batch .append (self ._queue .get (timeout =remaining ))
+                except queue .Empty :
+                    break 
+            try :
+                self ._flush (batch )
+            except Exception as e :
+                print (f"⚠️  Flush to {self .collection .name } failed, dropping {len (batch )} writes: {e }")
+                with self ._lock :
+                    self .failed +=len (batch )
+
+    def _drain (self ):
+        while True :
+            batch =[]
+            while len (batch )<self .max_batch :
+                try :
+                    batch .append (self ._queue .get_nowait ())
+                except queue .Empty :
+                    break 
+            if not batch :
+                return 
+            self ._flush (batch )
+
+    def _flush (self ,batch :List [tuple ]):
+        lag =time .monotonic ()-batch [0 ][1 ]
+        self ._write ([operation for operation ,_ in batch ])
+        with self ._lock :
+            self .batches +=1 
+            self .max_flush_lag =max (self .max_flush_lag ,lag )
+
+    def _write (self ,operations :List ):
+        while operations :
+            try :
+                self .collection .bulk_write (operations ,ordered =True )
+                with self ._lock :
+                    self .written +=len (operations )
+                return 
+            except BulkWriteError as e :
+                write_errors =(e .details or {}).get ("writeErrors")or []
+                if not write_errors :
+                    # Write concern errors only: the writes were applied, just not confirmed
+                    print (f"⚠️  Batched write to {self .collection .name } not acknowledged: {e .details }")
+                    with self ._lock :
+                        self .written +=len (operations )
+                    return 
+                index =write_errors [0 ]["index"]
+                print (f"⚠️  Batched write to {self .collection .name } failed: {write_errors [0 ].get ('errmsg')}")
+                with self ._lock :
+                    self .written +=index 
+                    self .failed +=1 
+                operations =operations [index +1 :]
+            except Exception as e :
+                print (f"⚠️  Batched write to {self .collection .name } failed: {e }")
+                with self ._lock :
+                    self .failed +=len (operations )
+                return 
+
+    def get_stats (self )->dict :
+        with self ._lock :
+            return {
+            "buffered":self ._queue .qsize (),
+            "max_buffer":self ._queue .maxsize ,
+            "submitted":self .submitted ,
+            "written":self .written ,
+            "batches":self .batches ,
+            "avg_batch":round ((self .written -self .overflow_writes )/self .batches ,1 )if self .batches else 0.0 ,
+            "overflow_writes":self .overflow_writes ,
+            "failed":self .failed ,
+            "max_flush_lag":round (self .max_flush_lag ,3 )
+            }
+
 
-def log_debate_turn (db ,data ):
+def log_debate_turn (db ,data ,writer :Optional [BatchWriter ]=None ):
     """
     Stores a COPY of the debate turn for analytics / auditing.
+    With a writer the copy is queued for a batched insert.
     """
     log_data =data .copy ()
 
@@ -11,4 +166,7 @@ def log_debate_turn (db ,data ):
 
     log_data ["logged_at"]=datetime .now (timezone .utc )
 
-    db .debate_logs .insert_one (log_data )
+    if writer is not None :
+        writer .insert (log_data )
+    else :
+        db .debate_logs .insert_one (log_data )
@@ -0,0 +1,74 @@
+"""
+Fast JSON Provider - orjson for Flask
+Serializes responses with orjson when installed, the stdlib otherwise
+"""
+
+import json 
+from datetime import date ,datetime ,timezone 
+
+from bson import ObjectId 
+from flask .json .provider import JSONProvider 
+
+try :
+    import orjson 
+except ImportError :
+    orjson =None 
+
+
+def _default (value ):
+    """Types neither encoder handles natively"""
+    if isinstance (value ,ObjectId ):
+        return str (value )
+    if isinstance (value ,(set ,frozenset )):
+        return list (value )
+    if hasattr (value ,"item"):
+        return value .item ()
+    raise TypeError (f"Object of type {type (value ).__name__ } is not JSON serializable")
+
+
+def _stdlib_default (value ):
+    if isinstance (value ,datetime ):
+        if value .tzinfo is None :
+            value =value .replace (tzinfo =timezone .utc )
+        return value .isoformat ()
+    if isinstance (value ,date ):
+        return value .isoformat ()
+    return _default (value )
+
+
+class FastJSONProvider (JSONProvider ):
+    """
+    App-wide JSON provider.
+
+    With orjson, datetimes (naive ones are UTC, as pymongo returns them) and
+    numpy scalars are encoded natively and ObjectIds become strings; the
+    stdlib fallback produces the same output, just slower.
+    """
+
+    if orjson is not None :
+        OPTIONS =orjson .OPT_NAIVE_UTC |orjson .OPT_SERIALIZE_NUMPY |orjson .OPT_NON_STR_KEYS 
+
+    def dumps (self ,obj ,**kwargs )->str :
+        if orjson is not None and not kwargs :
+            return orjson .dumps (obj ,default =_default ,option =self .OPTIONS ).decode ("utf-8")
+        kwargs .setdefault ("default",_stdlib_default )
+        kwargs .setdefault ("ensure_ascii",False )
+        kwargs .setdefault ("separators",(",",":"))
+        return json .dumps (obj ,**kwargs )
+
+    def loads (self ,s ,**kwargs ):
+        if orjson is not None and not kwargs :
+            return orjson .loads (s )
+        return json .loads (s ,**kwargs )
+
+    def response (self ,*args ,**kwargs ):
+        obj =self ._prepare_response_obj (args ,kwargs )
+        if orjson is not None :
+            body =orjson .dumps (obj ,default =_default ,option =self .OPTIONS )
+        else :
+            body =self .dumps (obj )
+        return self ._app .response_class (body ,mimetype ="application/json")
+
+
+def json_backend ()->str :
+    return "orjson"if orjson is not None else "json"
@@ -0,0 +1,219 @@
+"""
+Persistent Job Queue - Mongo-backed Background Jobs
+Runs slow work on a bounded worker pool, deduplicated and restart-safe
+"""
+
+import os 
+import socket 
+import threading 
+from datetime import datetime ,timezone ,timedelta 
+from typing import Callable ,Dict ,Optional ,Tuple 
+
+from pymongo import ReturnDocument 
+from pymongo .errors import DuplicateKeyError 
+
+
+def _now ()->datetime :
+    return datetime .now (timezone .utc )
+
+
+class JobQueue :
+    """
+    Background jobs stored in a Mongo collection.
+
+    - enqueue() upserts by dedupe key, so repeated requests for the same work
+      share one job (and a finished job's result) until the job fails
+    - a fixed pool of worker threads claims queued jobs atomically and holds
+      a lease; a job whose worker died is reclaimed once its lease expires,
+      so queued and running work survives a restart
+    - handler errors carrying retry_after (RateLimitExceeded) requeue the job
+      after that delay; any other error fails it
+    - wait() wakes on completions in this process and otherwise returns after
+      the timeout, so callers re-reading the job also see other processes
+
+    The collection needs a unique index on dedupe_key partial on
+    {active: True} and one on (status, not_before); the queue does not
+    create them itself.
+    """
+
+    def __init__ (self ,collection ,handler :Callable [[Dict ],Dict ],workers :int ,
+    lease_seconds :float ,poll_interval :float =1.0 ,max_attempts :int =3 ):
+        self .collection =collection 
+        self .handler =handler 
+        self .workers =workers 
+        self .lease_seconds =lease_seconds 
+        self .poll_interval =poll_interval 
+        self .max_attempts =max_attempts 
+        self .worker_id =f"{socket .gethostname ()}:{os .getpid ()}"
+
+        self ._wakeup =threading .Event ()
+        self ._changed =threading .Condition ()
+        self ._stopping =threading .Event ()
+        self ._threads =[]
+        self ._lock =threading .Lock ()
+
+        self .enqueued =0 
+        self .deduplicated =0 
+        self .completed =0 
+        self .failed =0 
+        self .retried =0 
+        self .reclaimed =0 
+
+    def start (self ):
+        with self ._lock :
+            if self ._threads :
+                return 
+            for i in range (self .workers ):
+                thread =threading .Thread (target =self ._run ,name =f"job-worker-{i }",daemon =True )
+                thread .start ()
+                self ._threads .append (thread )
+
+    def stop (self ):
+        self ._stopping .set ()
+        self ._wakeup .set ()
+
+    def enqueue (self ,dedupe_key :str ,payload :Dict )->Tuple [Dict ,bool ]:
+        """
+        Returns:
+            (job, created): the active job for dedupe_key, and whether this
+            call created it
+        """
+        now =_now ()
+        try :
+            existing =self .collection .find_one_and_update (
+            {"dedupe_key":dedupe_key ,"active":True },
+            {"$setOnInsert":{
+            "payload":payload ,
+            "status":"queued",
+            "attempts":0 ,
+            "not_before":now ,
+            "created_at":now ,
+            "updated_at":now 
+            }},
+            upsert =True ,
+            return_document =ReturnDocument .BEFORE 
+            )
+        except DuplicateKeyError :
+            existing =True 
+
+        created =existing is None 
+        job =self .collection .find_one ({"dedupe_key":dedupe_key ,"active":True })
+        with self ._lock :
+            if created :
+                self .enqueued +=1 
+            else :
+                self .deduplicated +=1 
+        self ._wakeup .set ()
+        return job ,created 
+
+    def get (self ,job_id ,owner_filter :Optional [Dict ]=None )->Optional [Dict ]:
+        query ={"_id":job_id }
+        query .update (owner_filter or {})
+        return self .collection .find_one (query )
+
+    def wait (self ,timeout :float ):
+        """Block until a job finishes in this process, or timeout seconds pass"""
+        with self ._changed :
+            self ._changed .wait (timeout )
+
+    def _notify (self ):
+        with self ._changed :
+            self ._changed .notify_all ()
+
+    def _claim (self )->Optional [Dict ]:
+        now =_now ()
+        lease_until =now +timedelta (seconds =self .lease_seconds )
+        previous =self .collection .find_one_and_update (
+        {"$or":[
+        {"status":"queued","not_before":{"$lte":now }},
+        {"status":"running","lease_until":{"$lt":now }}
+        ]},
+        {
+        "$set":{
+        "status":"running",
+        "worker":self .worker_id ,
+        "lease_until":lease_until ,
+        "updated_at":now 
+        },
+        "$inc":{"attempts":1 }
+        },
+        sort =[("created_at",1 )],
+        return_document =ReturnDocument .BEFORE 
+        )
+        if previous is None :
+            return None 
+
+        if previous ["status"]=="running":
+            print (f"♻️  Reclaiming job {previous ['_id']} from {previous .get ('worker')}")
+            with self ._lock :
+                self .reclaimed +=1 
+        return dict (
+        previous ,status ="running",worker =self .worker_id ,
+        lease_until =lease_until ,attempts =previous ["attempts"]+1 
+        )
+
+    def _finish (self ,job :Dict ,fields :Dict ):
+        fields ["updated_at"]=_now ()
+        self .collection .update_one (
+        {"_id":job ["_id"],"worker":self .worker_id ,"attempts":job ["attempts"]},
+        {"$set":fields ,"$unset":{"lease_until":""}}
+        )
+        self ._notify ()
+
+    def _run (self ):
+        while not self ._stopping .is_set ():
+            try :
+                job =self ._claim ()
+            except Exception as e :
+                print (f"⚠️  Job claim failed: {e }")
+                job =None 
+
+            if job is None :
+                self ._wakeup .wait (self .poll_interval )
+                self ._wakeup .clear ()
+                continue 
+
+            self ._process (job )
+
+    def _process (self ,job :Dict ):
+        if job ["attempts"]>self .max_attempts :
+            self ._fail (job ,"Job abandoned after repeated worker failures")
+            return 
+
+        try :
+            result =self .handler (job )
+        except Exception as e :
+            retry_after =getattr (e ,"retry_after",None )
+            if retry_after is not None and job ["attempts"]<self .max_attempts :
+                with self ._lock :
+                    self .retried +=1 
+                self ._finish (job ,{
+                "status":"queued",
+                "not_before":_now ()+timedelta (seconds =retry_after ),
+                "error":str (e )
+                })
+                return 
+            print (f"❌ Job {job ['_id']} failed: {e }")
+            self ._fail (job ,str (e ))
+            return 
+
+        with self ._lock :
+            self .completed +=1 
+        self ._finish (job ,{"status":"done","result":result ,"error":None ,"finished_at":_now ()})
+
+    def _fail (self ,job :Dict ,error :str ):
+        with self ._lock :
+            self .failed +=1 
+        self ._finish (job ,{"status":"failed","active":False ,"error":error ,"finished_at":_now ()})
+
+    def get_stats (self )->dict :
+        with self ._lock :
+            return {
+            "workers":self .workers ,
+            "enqueued":self .enqueued ,
+            "deduplicated":self .deduplicated ,
+            "completed":self .completed ,
+            "failed":self .failed ,
+            "retried":self .retried ,
+            "reclaimed":self .reclaimed 
+            }
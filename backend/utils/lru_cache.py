@@ -0,0 +1,111 @@
+"""
+LRU Cache - Bounded LRU with optional TTL
+Keeps per-worker cache memory under a fixed entry count and byte budget
+"""
+
+import sys 
+import threading 
+import time 
+from collections import OrderedDict 
+from typing import Any ,Optional 
+
+
+def estimate_size (value :Any )->int :
+    """
+    Approximate bytes held by a cached value, counting what containers hold.
+    Array views count their buffer; dicts, lists and tuples are walked recursively.
+    """
+    if getattr (value ,"base",None )is not None and isinstance (getattr (value ,"nbytes",None ),int ):
+        return sys .getsizeof (value )+value .nbytes 
+    if isinstance (value ,dict ):
+        return sys .getsizeof (value )+sum (estimate_size (k )+estimate_size (v )for k ,v in value .items ())
+    if isinstance (value ,(list ,tuple ,set ,frozenset )):
+        return sys .getsizeof (value )+sum (estimate_size (v )for v in value )
+    return sys .getsizeof (value )
+
+
+class LRUCache :
+    """
+    Thread-safe LRU cache with a byte budget and optional TTL.
+
+    Entries are evicted least-recently-used first whenever either the entry
+    limit or the byte budget is exceeded. Expired entries are dropped on read.
+    """
+
+    def __init__ (self ,max_entries :int ,max_bytes :int ,ttl :float =0 ):
+        self .max_entries =max_entries 
+        self .max_bytes =max_bytes 
+        self .ttl =ttl 
+
+        self ._entries =OrderedDict ()
+        self ._bytes =0 
+        self ._lock =threading .Lock ()
+
+        self .hits =0 
+        self .misses =0 
+        self .evictions =0 
+        self .expirations =0 
+
+    def get (self ,key :str )->Optional [Any ]:
+        with self ._lock :
+            entry =self ._entries .get (key )
+            if entry is None :
+                self .misses +=1 
+                return None 
+
+            value ,size ,stored_at =entry 
+            if self .ttl and time .monotonic ()-stored_at >self .ttl :
+                del self ._entries [key ]
+                self ._bytes -=size 
+                self .expirations +=1 
+                self .misses +=1 
+                return None 
+
+            self ._entries .move_to_end (key )
+            self .hits +=1 
+            return value 
+
+    def put (self ,key :str ,value :Any ):
+        size =estimate_size (value )
+        if size >self .max_bytes :
+            return 
+
+        with self ._lock :
+            old =self ._entries .pop (key ,None )
+            if old is not None :
+                self ._bytes -=old [1 ]
+
+            self ._entries [key ]=(value ,size ,time .monotonic ())
+            self ._bytes +=size 
+
+            while self ._entries and (
+            len (self ._entries )>self .max_entries or self ._bytes >self .max_bytes 
+            ):
+                _ ,(_ ,evicted_size ,_ )=self ._entries .popitem (last =False )
+                self ._bytes -=evicted_size 
+                self .evictions +=1 
+
+    def clear (self ):
+        with self ._lock :
+            self ._entries .clear ()
+            self ._bytes =0 
+
+    def __len__ (self )->int :
+        return len (self ._entries )
+
+    def get_stats (self )->dict :
+        with self ._lock :
+            lookups =self .hits +self .misses 
+            return {
+            "cached_items":len (self ._entries ),
+            "cached_bytes":self ._bytes ,
+            "max_items":self .max_entries ,
+            "max_bytes":self .max_bytes ,
+            "ttl_seconds":self .ttl ,
+            "hits":self .hits ,
+            "misses":self .misses ,
+            "hit_rate":round (self .hits /lookups ,3 )if lookups else 0.0 ,
+            "evictions":self .evictions ,
+            "expirations":self .expirations 
+            }
+
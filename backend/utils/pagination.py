@@ -0,0 +1,84 @@
+"""
+Keyset Pagination - Cursor Pages over (timestamp, _id)
+Each page is one indexed range scan, however deep the caller pages
+"""
+
+import base64 
+import json 
+from datetime import datetime 
+from typing import Dict ,List ,Optional ,Tuple 
+
+from bson import ObjectId 
+
+
+MAX_PAGE_SIZE =100 
+
+
+def encode_cursor (timestamp :datetime ,object_id )->str :
+    raw =json .dumps ({"t":timestamp .isoformat (),"id":str (object_id )})
+    return base64 .urlsafe_b64encode (raw .encode ("utf-8")).decode ("ascii").rstrip ("=")
+
+
+def decode_cursor (cursor :str )->Tuple [datetime ,ObjectId ]:
+    """
+    Raises:
+        ValueError: if the cursor is malformed
+    """
+    try :
+        padded =cursor +"="*(-len (cursor )%4 )
+        data =json .loads (base64 .urlsafe_b64decode (padded .encode ("ascii")))
+        return datetime .fromisoformat (data ["t"]),ObjectId (data ["id"])
+    except Exception :
+        raise ValueError ("Invalid cursor")
+
+
+def page_size (value ,default :int )->int :
+    """Clamp a requested page size to 1..MAX_PAGE_SIZE"""
+    try :
+        return max (1 ,min (MAX_PAGE_SIZE ,int (value )))
+    except (TypeError ,ValueError ):
+        return default 
+
+
+def keyset_page (collection ,query :Dict ,projection :Optional [Dict ],sort_field :str ,
+limit :int ,cursor :Optional [str ]=None )->Tuple [List [Dict ],Optional [str ]]:
+    """
+    Newest-first page of documents after `cursor`
+
+    Args:
+        collection: Collection to read
+        query: Filter (should match an index prefix ending in sort_field, _id)
+        projection: Fields to return (None for whole documents)
+        sort_field: Timestamp field to page on
+        limit: Page size
+        cursor: Cursor returned with the previous page
+
+    Returns:
+        (documents, next cursor or None on the last page)
+
+    Raises:
+        ValueError: if the cursor is malformed
+    """
+    query =dict (query )
+    if cursor :
+        timestamp ,object_id =decode_cursor (cursor )
+        query ["$or"]=[
+        {sort_field :{"$lt":timestamp }},
+        {sort_field :timestamp ,"_id":{"$lt":object_id }}
+        ]
+
+    if projection is not None :
+        projection =dict (projection ,**{sort_field :1 })
+
+    docs =list (
+    collection .find (query ,projection )
+    .sort ([(sort_field ,-1 ),("_id",-1 )])
+    .limit (limit +1 )
+    )
+
+    next_cursor =None 
+    if len (docs )>limit :
+        docs =docs [:limit ]
+        last =docs [-1 ]
+        next_cursor =encode_cursor (last [sort_field ],last ["_id"])
+    return docs ,next_cursor 
@@ -0,0 +1,142 @@
+"""
+Single-Flight Call Coalescing
+Concurrent callers asking for the same key share one in-flight upstream call
+"""
+
+import asyncio 
+import hashlib 
+import threading 
+import weakref 
+from typing import Any ,Awaitable ,Callable ,Optional 
+
+
+def prompt_key (*parts :str )->str :
+    """Deterministic key for an LLM call built from its prompt parts"""
+    digest =hashlib .sha256 ()
+    for part in parts :
+        digest .update (part .encode ("utf-8"))
+        digest .update (b"\x00")
+    return digest .hexdigest ()
+
+
+class FlightTimeout (Exception ):
+    """Raised when a follower gives up waiting on the leader's call"""
+
+
+class _Call :
+    def __init__ (self ):
+        self .done =threading .Event ()
+        self .value =None 
+        self .error =None 
+
+
+class SingleFlight :
+    """
+    Deduplicates concurrent calls by key.
+
+    The first caller for a key becomes the leader and runs the call; callers
+    arriving while it is in flight wait and receive the same result or error.
+    Nothing is cached once the call finishes. Works across threads via do()
+    (or claim/resolve/wait for batched leaders) and across asyncio tasks on
+    one event loop via do_async().
+    """
+
+    def __init__ (self ):
+        self ._flights ={}
+        self ._async_flights =weakref .WeakKeyDictionary ()
+        self ._lock =threading .Lock ()
+
+        self .leaders =0 
+        self .shared =0 
+
+    def claim (self ,key :str ):
+        """
+        Join or start the flight for a key
+
+        Returns:
+            (call, True) if the caller must run the call and resolve() it,
+            (call, False) if another caller is already running it
+        """
+        with self ._lock :
+            call =self ._flights .get (key )
+            if call is not None :
+                self .shared +=1 
+                return call ,False 
+
+            call =_Call ()
+            self ._flights [key ]=call 
+            self .leaders +=1 
+            return call ,True 
+
+    def resolve (self ,key :str ,call :_Call ,value :Any =None ,error :BaseException =None ):
+        """Publish the leader's result (or error) and end the flight"""
+        call .value =value 
+        call .error =error 
+        with self ._lock :
+            if self ._flights .get (key )is call :
+                del self ._flights [key ]
+        call .done .set ()
+
+    @staticmethod 
+    def wait (call :_Call ,timeout :Optional [float ]=None )->Any :
+        """
+        Block until the leader resolves the call
+
+        Raises:
+            FlightTimeout: if timeout seconds pass first (the flight keeps running)
+        """
+        if not call .done .wait (timeout ):
+            raise FlightTimeout (f"Call still in flight after {timeout :.1f}s")
+        if call .error is not None :
+            raise call .error 
+        return call .value 
+
+    def do (self ,key :str ,fn :Callable [[],Any ])->Any :
+        """Run fn once for all threads currently asking for key"""
+        call ,leader =self .claim (key )
+        if not leader :
+            return self .wait (call )
+
+        try :
+            value =fn ()
+        except BaseException as e :
+            self .resolve (key ,call ,error =e )
+            raise 
+        self .resolve (key ,call ,value )
+        return value 
+
+    async def do_async (self ,key :str ,fn :Callable [[],Awaitable [Any ]])->Any :
+        """Run the coroutine from fn once for all tasks on this loop asking for key"""
+        loop =asyncio .get_running_loop ()
+        flights =self ._async_flights .setdefault (loop ,{})
+
+        future =flights .get (key )
+        if future is not None :
+            self .shared +=1 
+            return await asyncio .shield (future )
+
+        future =loop .create_future ()
+        future .add_done_callback (lambda f :f .cancelled ()or f .exception ())
+        flights [key ]=future 
+        self .leaders +=1 
+
+        try :
+            value =await fn ()
+        except asyncio .CancelledError :
+            future .cancel ()
+            raise 
+        except BaseException as e :
+            future .set_exception (e )
+            raise 
+        else :
+            future .set_result (value )
+            return value 
+        finally :
+            flights .pop (key ,None )
+
+    def get_stats (self )->dict :
+        return {
+        "in_flight":len (self ._flights ),
+        "leaders":self .leaders ,
+        "shared":self .shared 
+        }
@@ -32,6 +32,7 @@ export default function DebateSessionPage() {
   const [loading, setLoading] = useState(false)
   const [streamingText, setStreamingText] = useState("")
   const [debateIds, setDebateIds] = useState<string[]>([])
+  const [sessionId, setSessionId] = useState<string | null>(null)
 
   /* ---------- Metrics ---------- */
   const [currentScore, setCurrentScore] = useState<number | null>(null)
@@ -159,6 +160,7 @@ export default function DebateSessionPage() {
         if (response.turn_score) setCurrentScore(response.turn_score)
         if (response.difficulty_level) setDifficulty(response.difficulty_level)
         if (response.debate_id) setDebateIds((ids) => [...ids, response.debate_id])
+        if (response.session_id) setSessionId(response.session_id)
 
         if (mode === "turn-based") {
           setTurnsLeft((t) => (t !== null ? t - 1 : 0))
@@ -182,7 +184,8 @@ export default function DebateSessionPage() {
         setMessages((m) => m.filter((msg) => msg.id !== aiMsgId))
         setLoading(false)
         setStreamingText("")
-      }
+      },
+      sessionId
     )
   }
 
@@ -199,7 +202,7 @@ export default function DebateSessionPage() {
     setGeneratingSummary(true)
 
     try {
-      const summaryData = await generateDebateSummary(topic, debateIds, token)
+      const summaryData = await generateDebateSummary(topic, debateIds, token, sessionId)
       showToast("Summary generated successfully!", "success")
       router.push(`/debate/review?id=${summaryData.summary_id}`)
     } catch (error) {
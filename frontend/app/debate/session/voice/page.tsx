@@ -28,6 +28,7 @@ export default function VoiceDebateSessionPage() {
   const [messages, setMessages] = useState<Message[]>([])
   const [loading, setLoading] = useState(false)
   const [debateIds, setDebateIds] = useState<string[]>([])
+  const [sessionId, setSessionId] = useState<string | null>(null)
 
   const [currentScore, setCurrentScore] = useState<number | null>(null)
   const [difficulty, setDifficulty] = useState(3)
@@ -275,6 +276,7 @@ export default function VoiceDebateSessionPage() {
         if (response.turn_score) setCurrentScore(response.turn_score)
         if (response.difficulty_level) setDifficulty(response.difficulty_level)
         if (response.debate_id) setDebateIds((ids) => [...ids, response.debate_id])
+        if (response.session_id) setSessionId(response.session_id)
         if (mode === "turn-based") setTurnsLeft((t) => (t !== null ? t - 1 : 0))
 
         // Speak any trailing text that didn't end with punctuation
@@ -305,7 +307,8 @@ export default function VoiceDebateSessionPage() {
         showToast("Failed to get AI response. Please try again.", "error")
         setMessages((m) => m.filter((msg) => msg.id !== aiMsgId))
         setLoading(false)
-      }
+      },
+      sessionId
     )
   }
 
@@ -324,7 +327,7 @@ export default function VoiceDebateSessionPage() {
     if (debateIds.length === 0) { router.push("/dashboard"); return }
     setGeneratingSummary(true)
     try {
-      const summaryData = await generateDebateSummary(topic, debateIds, token)
+      const summaryData = await generateDebateSummary(topic, debateIds, token, sessionId)
       showToast("Summary generated successfully!", "success")
       router.push(`/debate/review?id=${summaryData.summary_id}`)
     } catch {
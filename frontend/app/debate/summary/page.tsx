@@ -6,6 +6,7 @@ import { Button } from "@/components/ui/button"
 import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/card"
 import { Badge } from "@/components/ui/badge"
 import { Brain, TrendingUp, AlertCircle, Lightbulb, Target } from "lucide-react"
+import { generateDebateSummary } from "@/lib/api"
 
 interface Summary {
   overall_score: number
@@ -49,19 +50,8 @@ function SummaryContent() {
       return
     }
 
-    // Generate summary from backend
-    fetch(`${process.env.NEXT_PUBLIC_API_URL}/api/debate/summary`, {
-      method: "POST",
-      headers: { 
-        "Content-Type": "application/json",
-        Authorization: `Bearer ${token}` 
-      },
-      body: JSON.stringify({
-        topic: topic,
-        debate_ids: debateIds
-      })
-    })
-      .then(res => res.json())
+    // Queue the summary job and poll until it finishes (or the wait times out)
+    generateDebateSummary(topic, debateIds, token)
       .then(data => {
         if (data.summary) {
           setSummary(data.summary)
@@ -71,7 +61,7 @@ function SummaryContent() {
       })
       .catch(err => {
         console.error("Summary error:", err)
-        setError("Failed to load summary")
+        setError(err?.message || "Failed to load summary")
       })
       .finally(() => setLoading(false))
   }, [topic, debateIds, router])
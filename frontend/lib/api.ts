@@ -53,16 +53,21 @@ export async function apiDebateStream(
   token: string,
   onChunk: (text: string) => void,
   onComplete: (response: any) => void,
-  onError: (error: Error) => void
+  onError: (error: Error) => void,
+  sessionId?: string | null
 ) {
   try {
-    const response = await fetch(`${API_BASE}/api/debate`, {
+    const response = await fetch(`${API_BASE}/api/debate/stream`, {
       method: "POST",
       headers: {
         "Content-Type": "application/json",
         Authorization: `Bearer ${token}`,
       },
-      body: JSON.stringify({ topic, argument }),
+      body: JSON.stringify({
+        topic,
+        argument,
+        ...(sessionId && { session_id: sessionId }),
+      }),
     });
 
     if (!response.ok) {
@@ -72,20 +77,46 @@ export async function apiDebateStream(
       throw error;
     }
 
-    const data = await response.json();
-
-    // Simulate streaming by breaking response into chunks
-    const aiResponse = data.ai_response || "";
-    const words = aiResponse.split(" ");
+    // Server-Sent Events: chunk (counter-argument text), metrics, done, error
+    const reader = response.body!.getReader();
+    const decoder = new TextDecoder();
+    let buffer = "";
     let accumulated = "";
 
-    for (let i = 0; i < words.length; i++) {
-      accumulated += (i > 0 ? " " : "") + words[i];
-      onChunk(accumulated);
-      await new Promise((resolve) => setTimeout(resolve, 30));
+    while (true) {
+      const { value, done } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+
+      let boundary;
+      while ((boundary = buffer.indexOf("\n\n")) !== -1) {
+        const raw = buffer.slice(0, boundary);
+        buffer = buffer.slice(boundary + 2);
+
+        let event = "message";
+        let payload = "";
+        for (const line of raw.split("\n")) {
+          if (line.startsWith("event:")) event = line.slice(6).trim();
+          else if (line.startsWith("data:")) payload += line.slice(5).trim();
+        }
+        if (!payload) continue;
+        const data = JSON.parse(payload);
+
+        if (event === "chunk") {
+          accumulated += data.text;
+          onChunk(accumulated);
+        } else if (event === "done") {
+          onComplete(data);
+          return;
+        } else if (event === "error") {
+          const error = new Error(data.error || "Failed to get AI response");
+          (error as any).retryAfter = data.retry_after;
+          throw error;
+        }
+      }
     }
 
-    onComplete(data);
+    throw new Error("Stream ended before the response completed");
   } catch (error) {
     onError(error as Error);
   }
@@ -94,13 +125,45 @@ export async function apiDebateStream(
 export async function generateDebateSummary(
   topic: string,
   debateIds: string[],
-  token: string
+  token: string,
+  sessionId?: string | null
 ) {
-  return apiPost(
+  // Summaries run as background jobs; a finished duplicate comes back immediately
+  const job = await apiPost(
     "/api/debate/summary",
-    { topic, debate_ids: debateIds },
+    sessionId
+      ? { topic, debate_ids: debateIds, session_id: sessionId }
+      : { topic, debate_ids: debateIds },
     token
   );
+  if (job.status === "done") return job;
+  return waitForSummaryJob(job.job_id, token);
+}
+
+export async function getSummaryJob(jobId: string, token: string) {
+  return apiGet(`/api/debate/summary/jobs/${jobId}`, token);
+}
+
+export async function waitForSummaryJob(
+  jobId: string,
+  token: string,
+  pollInterval = 1000,
+  maxPollInterval = 8000,
+  maxWait = 180000
+) {
+  // Poll the job, backing off while it is still queued or running
+  const deadline = Date.now() + maxWait;
+  let delay = pollInterval;
+  while (Date.now() < deadline) {
+    await new Promise((resolve) => setTimeout(resolve, delay));
+    const job = await getSummaryJob(jobId, token);
+    if (job.status === "done") return job;
+    if (job.status === "failed") {
+      throw new Error(job.error || "Failed to generate summary");
+    }
+    delay = Math.min(delay * 1.5, maxPollInterval, Math.max(0, deadline - Date.now()));
+  }
+  throw new Error("Summary is taking longer than expected, please try again later");
 }
 
 export async function getDebateSummary(summaryId: string, token: string) {
@@ -111,6 +174,45 @@ export async function getDebateHistory(debateId: string, token: string) {
   return apiGet(`/api/debate/history/${debateId}`, token);
 }
 
+// Cursor-paged lists: pass back next_cursor for the following page;
+// "list" views omit the full texts, fetch those per item when needed
+type ListView = "list" | "full";
+
+function pageQuery(cursor?: string | null, limit?: number, view?: ListView) {
+  const params = new URLSearchParams();
+  if (cursor) params.set("cursor", cursor);
+  if (limit) params.set("limit", String(limit));
+  if (view) params.set("view", view);
+  const query = params.toString();
+  return query ? `?${query}` : "";
+}
+
+export async function getDebateHistoryPage(
+  token: string,
+  cursor?: string | null,
+  limit?: number,
+  view: ListView = "list"
+) {
+  return apiGet(`/api/debate/history${pageQuery(cursor, limit, view)}`, token);
+}
+
+export async function getSummariesPage(
+  token: string,
+  cursor?: string | null,
+  limit?: number,
+  view: ListView = "list"
+) {
+  return apiGet(`/api/debate/summaries${pageQuery(cursor, limit, view)}`, token);
+}
+
+export async function getSessionsPage(
+  token: string,
+  cursor?: string | null,
+  limit?: number
+) {
+  return apiGet(`/api/debate/sessions${pageQuery(cursor, limit)}`, token);
+}
+
 export async function checkHealth() {
   try {
     const response = await fetch(`${API_BASE}/api/health`);